@@ -4,155 +4,359 @@
 UI/UX Pro Max Core - BM25 search engine for UI/UX style guides
 """
 
+import atexit
 import csv
+import heapq
+import json
+import os
 import re
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
 from pathlib import Path
 from math import log
-from collections import defaultdict
+from itertools import islice
+from collections import Counter, OrderedDict, defaultdict
+from sys import intern
+from search_config import CSV_CONFIG, STACK_CONFIG, _STACK_COLS, AVAILABLE_STACKS, MAX_RESULTS
+
+np = sparse = None  # NumPy / SciPy, imported by _load_numpy() for large batches only
 
 # ============ CONFIGURATION ============
 DATA_DIR = Path(__file__).parent.parent / "data"
-MAX_RESULTS = 3
-
-CSV_CONFIG = {
-    "style": {
-        "file": "styles.csv",
-        "search_cols": ["Style Category", "Keywords", "Best For", "Type", "AI Prompt Keywords"],
-        "output_cols": ["Style Category", "Type", "Keywords", "Primary Colors", "Effects & Animation", "Best For", "Performance", "Accessibility", "Framework Compatibility", "Complexity", "AI Prompt Keywords", "CSS/Technical Keywords", "Implementation Checklist", "Design System Variables"]
-    },
-    "color": {
-        "file": "colors.csv",
-        "search_cols": ["Product Type", "Notes"],
-        "output_cols": ["Product Type", "Primary (Hex)", "Secondary (Hex)", "CTA (Hex)", "Background (Hex)", "Text (Hex)", "Notes"]
-    },
-    "chart": {
-        "file": "charts.csv",
-        "search_cols": ["Data Type", "Keywords", "Best Chart Type", "Accessibility Notes"],
-        "output_cols": ["Data Type", "Keywords", "Best Chart Type", "Secondary Options", "Color Guidance", "Accessibility Notes", "Library Recommendation", "Interactive Level"]
-    },
-    "landing": {
-        "file": "landing.csv",
-        "search_cols": ["Pattern Name", "Keywords", "Conversion Optimization", "Section Order"],
-        "output_cols": ["Pattern Name", "Keywords", "Section Order", "Primary CTA Placement", "Color Strategy", "Conversion Optimization"]
-    },
-    "product": {
-        "file": "products.csv",
-        "search_cols": ["Product Type", "Keywords", "Primary Style Recommendation", "Key Considerations"],
-        "output_cols": ["Product Type", "Keywords", "Primary Style Recommendation", "Secondary Styles", "Landing Page Pattern", "Dashboard Style (if applicable)", "Color Palette Focus"]
-    },
-    "ux": {
-        "file": "ux-guidelines.csv",
-        "search_cols": ["Category", "Issue", "Description", "Platform"],
-        "output_cols": ["Category", "Issue", "Platform", "Description", "Do", "Don't", "Code Example Good", "Code Example Bad", "Severity"]
-    },
-    "typography": {
-        "file": "typography.csv",
-        "search_cols": ["Font Pairing Name", "Category", "Mood/Style Keywords", "Best For", "Heading Font", "Body Font"],
-        "output_cols": ["Font Pairing Name", "Category", "Heading Font", "Body Font", "Mood/Style Keywords", "Best For", "Google Fonts URL", "CSS Import", "Tailwind Config", "Notes"]
-    },
-    "icons": {
-        "file": "icons.csv",
-        "search_cols": ["Category", "Icon Name", "Keywords", "Best For"],
-        "output_cols": ["Category", "Icon Name", "Keywords", "Library", "Import Code", "Usage", "Best For", "Style"]
-    },
-    "react": {
-        "file": "react-performance.csv",
-        "search_cols": ["Category", "Issue", "Keywords", "Description"],
-        "output_cols": ["Category", "Issue", "Platform", "Description", "Do", "Don't", "Code Example Good", "Code Example Bad", "Severity"]
-    },
-    "web": {
-        "file": "web-interface.csv",
-        "search_cols": ["Category", "Issue", "Keywords", "Description"],
-        "output_cols": ["Category", "Issue", "Platform", "Description", "Do", "Don't", "Code Example Good", "Code Example Bad", "Severity"]
-    }
-}
+INDEX_CACHE_SIZE = 32  # Max fitted (file, search_cols) indexes kept in memory
+TOKEN_CACHE_SIZE = 4096  # Distinct short texts (queries, field values) memoized by the tokenizer
+TOKEN_MEMO_MAX_CHARS = 32  # Longer texts are tokenized directly
+SPARSE_MIN_DOCS = 2000  # Batches on smaller corpora are faster walking postings than via SciPy
+RESULT_CACHE_SIZE = 1024  # Max search() / search_stack() answers kept; 0 disables the cache
+RESULT_CACHE_TTL = 3600.0  # Seconds an answer stays valid
+RESULT_CACHE_PERSIST_MAX = 256  # Newest answers written to the on-disk store
+RESULT_CACHE_ENV = "UI_PRO_MAX_RESULT_CACHE"  # Path of the on-disk store; unset keeps it in memory
 
-STACK_CONFIG = {
-    "html-tailwind": {"file": "stacks/html-tailwind.csv"},
-    "react": {"file": "stacks/react.csv"},
-    "nextjs": {"file": "stacks/nextjs.csv"},
-    "astro": {"file": "stacks/astro.csv"},
-    "vue": {"file": "stacks/vue.csv"},
-    "nuxtjs": {"file": "stacks/nuxtjs.csv"},
-    "nuxt-ui": {"file": "stacks/nuxt-ui.csv"},
-    "svelte": {"file": "stacks/svelte.csv"},
-    "swiftui": {"file": "stacks/swiftui.csv"},
-    "react-native": {"file": "stacks/react-native.csv"},
-    "flutter": {"file": "stacks/flutter.csv"},
-    "shadcn": {"file": "stacks/shadcn.csv"},
-    "jetpack-compose": {"file": "stacks/jetpack-compose.csv"}
-}
 
-# Common columns for all stacks
-_STACK_COLS = {
-    "search_cols": ["Category", "Guideline", "Description", "Do", "Don't"],
-    "output_cols": ["Category", "Guideline", "Description", "Do", "Don't", "Code Good", "Code Bad", "Severity", "Docs URL"]
-}
+# ============ TOKENIZER ============
+class Tokenizer:
+    """Single-pass tokenizer shared by BM25 indexing and querying.
+
+    Lowercases and keeps runs of word characters longer than 2 characters
+    (the same tokens as stripping punctuation and splitting on spaces) with
+    one precompiled findall. Short texts - queries and, when normalizers
+    are set, repeated field values such as categories - are tokenized once
+    into interned tokens and then served from an LRU memo; long, mostly
+    unique texts skip the memo and the interning, whose cost they would
+    never win back. normalizers are callables mapping a token list to a
+    token list (stopword removal, stemming, ...), applied in order on both
+    the index and the query side.
+    """
+
+    _WORD = re.compile(r'\w{3,}')
+
+    def __init__(self, normalizers=(), cache_size=TOKEN_CACHE_SIZE, memo_max_chars=TOKEN_MEMO_MAX_CHARS):
+        self.normalizers = tuple(normalizers)
+        self.memo_max_chars = memo_max_chars
+        self._memo = lru_cache(maxsize=cache_size)(self._tokenize)
+
+    def __call__(self, text):
+        """Tokens of a text (a tuple when memoized, else a list)"""
+        if not isinstance(text, str):
+            text = str(text)
+        if len(text) > self.memo_max_chars:
+            return self._split(text)
+        return self._memo(text)
+
+    def tokenize_fields(self, fields):
+        """Tokens of several field values, as if joined with spaces.
+
+        Without normalizers one findall over the joined text is cheaper than
+        any memo lookup. With normalizers, short fields go through the memo
+        so repeated values are normalized once; their tokens then come
+        before those of the long fields.
+        """
+        fields = [field if isinstance(field, str) else str(field) for field in fields]
+        if not self.normalizers:
+            return self._split(" ".join(fields))
+        memo, limit = self._memo, self.memo_max_chars
+        tokens, long_fields = [], []
+        for field in fields:
+            if len(field) > limit:
+                long_fields.append(field)
+            else:
+                tokens += memo(field)
+        if long_fields:
+            tokens += self._split(" ".join(long_fields))
+        return tokens
+
+    def _split(self, text):
+        tokens = self._WORD.findall(text.lower())
+        for normalize in self.normalizers:
+            tokens = list(normalize(tokens))
+        return tokens
+
+    def _tokenize(self, text):
+        return tuple(map(intern, self._split(text)))
+
+    def cache_info(self):
+        return self._memo.cache_info()
 
-AVAILABLE_STACKS = list(STACK_CONFIG.keys())
+    def cache_clear(self):
+        self._memo.cache_clear()
+
+
+def stopword_filter(stopwords):
+    """Normalizer that drops the given words"""
+    stopwords = frozenset(word.lower() for word in stopwords)
+
+    def remove_stopwords(tokens):
+        return [token for token in tokens if token not in stopwords]
+
+    return remove_stopwords
+
+
+DEFAULT_TOKENIZER = Tokenizer()
 
 
 # ============ BM25 IMPLEMENTATION ============
 class BM25:
-    """BM25 ranking algorithm for text search"""
+    """BM25 ranking algorithm for text search (inverted-index backed)"""
 
-    def __init__(self, k1=1.5, b=0.75):
+    def __init__(self, k1=1.5, b=0.75, tokenizer=None):
         self.k1 = k1
         self.b = b
-        self.corpus = []
+        self.tokenizer = tokenizer or DEFAULT_TOKENIZER
         self.doc_lengths = []
         self.avgdl = 0
         self.idf = {}
         self.doc_freqs = defaultdict(int)
+        self.postings = {}
         self.N = 0
 
     def tokenize(self, text):
-        """Lowercase, split, remove punctuation, filter short words"""
-        text = re.sub(r'[^\w\s]', ' ', str(text).lower())
-        return [w for w in text.split() if len(w) > 2]
+        """Tokens of a query or document; a tuple/list is tokenized per field"""
+        if isinstance(text, (tuple, list)):
+            return self.tokenizer.tokenize_fields(text)
+        return self.tokenizer(text)
 
     def fit(self, documents):
-        """Build BM25 index from documents"""
-        self.corpus = [self.tokenize(doc) for doc in documents]
-        self.N = len(self.corpus)
+        """Build BM25 index from an iterable of documents (consumed once)"""
+        postings = defaultdict(list)
+        self.doc_lengths = []
+
+        for idx, doc in enumerate(documents):
+            tokens = self.tokenize(doc)
+            self.doc_lengths.append(len(tokens))
+            for word, tf in Counter(tokens).items():
+                postings[word].append((idx, tf))
+
+        self.N = len(self.doc_lengths)
+        self.postings = dict(postings)
         if self.N == 0:
             return
-        self.doc_lengths = [len(doc) for doc in self.corpus]
         self.avgdl = sum(self.doc_lengths) / self.N
 
-        for doc in self.corpus:
-            seen = set()
-            for word in doc:
-                if word not in seen:
-                    self.doc_freqs[word] += 1
-                    seen.add(word)
-
-        for word, freq in self.doc_freqs.items():
+        for word, plist in self.postings.items():
+            freq = len(plist)
+            self.doc_freqs[word] = freq
             self.idf[word] = log((self.N - freq + 0.5) / (freq + 0.5) + 1)
 
-    def score(self, query):
-        """Score all documents against query"""
-        query_tokens = self.tokenize(query)
-        scores = []
+    def score(self, query, top_k=None):
+        """Score documents containing at least one query token.
+
+        Returns (doc_idx, score) pairs sorted by descending score (ties by
+        index). Documents sharing no token with the query are omitted since
+        their score is 0. With top_k, only the best top_k pairs are kept.
+        """
+        if self.N == 0:
+            return []
+
+        ranked = self._accumulate(query).items()
+        if top_k is None:
+            return sorted(ranked, key=_rank_key)
+        return heapq.nsmallest(top_k, ranked, key=_rank_key)
+
+    def _accumulate(self, query, ranges=None):
+        """{doc_idx: score} of the documents sharing a token with query.
+
+        ranges, if given, is a sorted list of disjoint (start, stop) doc
+        ranges. Postings lists are in doc order, so each one is cut to those
+        ranges by binary search and documents outside them are never visited.
+        """
+        k1, b, avgdl = self.k1, self.b, self.avgdl
+        doc_lengths = self.doc_lengths
+        scores = defaultdict(float)
+
+        for token, qf in Counter(self.tokenize(query)).items():
+            idf, plist = self._postings_for(token)
+            if not plist:
+                continue
+            segments = (plist,) if ranges is None else [
+                plist[bisect_left(plist, (start,)):bisect_left(plist, (stop,))]
+                for start, stop in ranges]
+            for segment in segments:
+                for idx, tf in segment:
+                    denominator = tf + k1 * (1 - b + b * doc_lengths[idx] / avgdl)
+                    scores[idx] += qf * (idf * tf * (k1 + 1) / denominator)
+        return scores
+
+    def score_batch(self, queries, top_k=None):
+        """Score several queries; returns one ranked list per query.
+
+        Batches over corpora of at least SPARSE_MIN_DOCS documents are
+        scored by a SparseBM25 built from this index on first use (when
+        NumPy/SciPy import); smaller ones walk the postings per query.
+        """
+        if len(queries) > 1 and self.N >= SPARSE_MIN_DOCS:
+            engine = self._sparse_engine()
+            if engine is not None:
+                return engine.score_batch(queries, top_k)
+        return [self.score(query, top_k) for query in queries]
+
+    def _sparse_engine(self):
+        """Memoized SparseBM25 over this fitted index; None if unavailable"""
+        engine = self.__dict__.get("_sparse")
+        if engine is None and self.postings and _load_numpy():
+            engine = self._sparse = SparseBM25.from_fitted(self)
+        return engine
+
+    def max_score(self, query):
+        """Upper bound of score(query) over any document.
+
+        Each query term contributes qf * idf * (k1 + 1), its limit as tf
+        grows. A term absent from the index counts with the IDF of a term
+        in no document, so a corpus missing query terms gets a larger bound.
+        """
+        if self.N == 0:
+            return 0.0
+        absent_idf = log((self.N + 0.5) / 0.5 + 1)
+        bound = 0.0
+        for token, qf in Counter(self.tokenize(query)).items():
+            idf, plist = self._postings_for(token)
+            bound += qf * (idf if plist else absent_idf) * (self.k1 + 1)
+        return bound
+
+    def _postings_for(self, token):
+        """Return (idf, [(doc_idx, tf), ...]) for a token"""
+        plist = self.postings.get(token)
+        if plist is None:
+            return 0.0, ()
+        return self.idf[token], plist
+
+
+def _rank_key(item):
+    """Sort key: higher score first, lower doc index breaks ties"""
+    return (-item[1], item[0])
+
+
+def _load_numpy():
+    """Import NumPy and SciPy on first use; False if either is missing"""
+    global np, sparse
+    if np is None:
+        try:
+            import numpy
+            from scipy import sparse as scipy_sparse
+        except ImportError:  # optional: the pure-Python BM25 is used instead
+            np = False
+            return False
+        np, sparse = numpy, scipy_sparse
+    return np is not False
+
+
+class SparseBM25(BM25):
+    """BM25 scored by sparse matrix products (requires NumPy and SciPy).
+
+    fit() precomputes a CSR term x document matrix of BM25 term weights, so
+    a batch of queries is one sparse mat-mat product followed by an
+    argpartition top-k per query; a single query walks the inherited
+    postings instead. Rankings match the pure-Python BM25. Only worth it
+    for large corpora; BM25.score_batch switches to it above
+    SPARSE_MIN_DOCS.
+    """
+
+    def __init__(self, k1=1.5, b=0.75, tokenizer=None):
+        super().__init__(k1, b, tokenizer)
+        self.vocab = {}
+        self.weights = None
+
+    @classmethod
+    def from_fitted(cls, bm25):
+        """SparseBM25 sharing the statistics and postings of a fitted BM25"""
+        engine = cls(bm25.k1, bm25.b, bm25.tokenizer)
+        engine.doc_lengths, engine.avgdl, engine.N = bm25.doc_lengths, bm25.avgdl, bm25.N
+        engine.idf, engine.doc_freqs, engine.postings = bm25.idf, bm25.doc_freqs, bm25.postings
+        engine._build_weights()
+        return engine
+
+    def fit(self, documents):
+        super().fit(documents)
+        self._build_weights()
+
+    def _build_weights(self):
+        if not _load_numpy():
+            raise ImportError("SparseBM25 requires NumPy and SciPy")
+        self.vocab = {term: i for i, term in enumerate(self.postings)}
+
+        indptr, indices, tfs, idfs = [0], [], [], []
+        for term, plist in self.postings.items():
+            for idx, tf in plist:
+                indices.append(idx)
+                tfs.append(tf)
+            indptr.append(len(indices))
+            idfs.extend([self.idf[term]] * len(plist))
 
-        for idx, doc in enumerate(self.corpus):
-            score = 0
-            doc_len = self.doc_lengths[idx]
-            term_freqs = defaultdict(int)
-            for word in doc:
-                term_freqs[word] += 1
+        indices = np.asarray(indices, dtype=np.int64)
+        tf = np.asarray(tfs, dtype=np.float64)
+        idf = np.asarray(idfs, dtype=np.float64)
+        if self.N:
+            doc_lengths = np.asarray(self.doc_lengths, dtype=np.float64)[indices]
+            denominator = tf + self.k1 * (1 - self.b + self.b * doc_lengths / self.avgdl)
+            data = idf * tf * (self.k1 + 1) / denominator
+        else:
+            data = tf
+        self.weights = sparse.csr_matrix((data, indices, np.asarray(indptr)),
+                                         shape=(len(self.vocab), self.N))
 
-            for token in query_tokens:
-                if token in self.idf:
-                    tf = term_freqs[token]
-                    idf = self.idf[token]
-                    numerator = tf * (self.k1 + 1)
-                    denominator = tf + self.k1 * (1 - self.b + self.b * doc_len / self.avgdl)
-                    score += idf * numerator / denominator
+    def score(self, query, top_k=None):
+        # One query touches only a few short posting lists; walking them
+        # beats building and multiplying a query matrix
+        return BM25.score(self, query, top_k)
 
-            scores.append((idx, score))
+    def score_batch(self, queries, top_k=None):
+        if self.N == 0 or not queries:
+            return [[] for _ in queries]
 
-        return sorted(scores, key=lambda x: x[1], reverse=True)
+        rows, cols, counts = [], [], []
+        for row, query in enumerate(queries):
+            for token, qf in Counter(self.tokenize(query)).items():
+                term_id = self.vocab.get(token)
+                if term_id is not None:
+                    rows.append(row)
+                    cols.append(term_id)
+                    counts.append(qf)
+        query_matrix = sparse.csr_matrix((counts, (rows, cols)), shape=(len(queries), len(self.vocab)),
+                                         dtype=np.float64)
+        scores = (query_matrix @ self.weights).tocsr()
+
+        ranked = []
+        for row in range(len(queries)):
+            start, end = scores.indptr[row], scores.indptr[row + 1]
+            ranked.append(_top_k(scores.indices[start:end], scores.data[start:end], top_k))
+        return ranked
+
+
+def _top_k(doc_ids, values, top_k):
+    """Rank (doc_ids, values) like BM25.score: score desc, doc index asc"""
+    keep = values > 0
+    doc_ids, values = doc_ids[keep], values[keep]
+    if top_k is not None and top_k < len(values):
+        if top_k <= 0:
+            return []
+        # Everything scoring at least the k-th best value, ties included
+        kth = values[np.argpartition(-values, top_k - 1)[top_k - 1]]
+        keep = values >= kth
+        doc_ids, values = doc_ids[keep], values[keep]
+    order = np.lexsort((doc_ids, -values))[:top_k]
+    return list(zip(doc_ids[order].tolist(), values[order].tolist()))
 
 
 # ============ SEARCH FUNCTIONS ============
@@ -162,24 +366,196 @@ def _load_csv(filepath):
         return list(csv.DictReader(f))
 
 
+def _iter_records(f):
+    """Yield (byte_offset, fields) for each CSV record of a binary file object.
+
+    csv.reader pulls exactly one physical line at a time, so the position
+    after a record is complete is the start of the next one.
+    """
+    start = f.tell()
+    pos = [start]
+
+    def lines():
+        for raw in f:
+            pos[0] += len(raw)
+            if raw.endswith(b'\r\n'):  # match text-mode universal newlines
+                raw = raw[:-2] + b'\n'
+            yield raw.decode('utf-8')
+
+    for fields in csv.reader(lines()):
+        yield start, fields
+        start = pos[0]
+
+
+def _iter_documents(filepath, search_cols, offsets):
+    """Stream the search fields of each data row, recording its byte offset.
+
+    Yields one document per row as a tuple of search column values
+    (csv.DictReader row semantics), so BM25 tokenizes - and memoizes -
+    each field value separately. Appends the row's offset to `offsets`,
+    so only offsets - never row dicts - are kept once the documents have
+    been tokenized.
+    """
+    with open(filepath, 'rb') as f:
+        records = _iter_records(f)
+        _, header = next(records, (0, []))
+        for offset, fields in records:
+            if not fields:  # csv.DictReader skips blank lines
+                continue
+            row = _record_to_dict(header, fields)
+            offsets.append(offset)
+            yield tuple(str(row.get(col, "")) for col in search_cols)
+
+
+def _read_record(filepath, offset):
+    """Read the single CSV record starting at a byte offset"""
+    with open(filepath, 'rb') as f:
+        f.seek(offset)
+        for _, fields in _iter_records(f):
+            return fields
+    return []
+
+
+class CsvRows:
+    """Lazy, read-only sequence of CSV rows addressed by byte offset.
+
+    Rows are materialized as dicts with csv.DictReader semantics only when
+    indexed, so callers holding a fitted index need not keep the CSV text.
+    """
+
+    def __init__(self, filepath, offsets, header=None):
+        self.filepath = filepath
+        self.offsets = offsets
+        self._header = header
+
+    @property
+    def header(self):
+        if self._header is None:
+            self._header = _read_record(self.filepath, 0)
+        return self._header
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, idx):
+        return _record_to_dict(self.header, _read_record(self.filepath, self.offsets[idx]))
+
+
+def _record_to_dict(header, fields):
+    """Map a CSV record onto header names the way csv.DictReader does"""
+    row = dict(zip(header, fields))
+    if len(header) < len(fields):
+        row[None] = fields[len(header):]
+    else:
+        for key in header[len(fields):]:
+            row[key] = None
+    return row
+
+
+_index_cache = OrderedDict()
+_index_lock = threading.Lock()  # search_server answers requests on threads
+_build_locks = {}  # cache key -> lock held while that index is being built
+
+
+def _index_key(filepath, search_cols):
+    """(cache key, signature) of a CSV's index"""
+    stat = filepath.stat()
+    return (str(filepath), tuple(search_cols)), (stat.st_mtime_ns, stat.st_size)
+
+
+def _cached_index(key, signature):
+    """(rows, BM25) from the cache if fresh, else None; call under _index_lock"""
+    entry = _index_cache.get(key)
+    if entry is not None and entry[0] == signature:
+        _index_cache.move_to_end(key)
+        return entry[1], entry[2]
+    return None
+
+
+def _get_index(filepath, search_cols):
+    """Return (rows, fitted BM25) for a CSV, reusing a cached index.
+
+    Entries are keyed by (path, search_cols), invalidated when the file's
+    mtime or size changes, and evicted least-recently-used beyond
+    INDEX_CACHE_SIZE. A fresh compiled index from index_store is mapped
+    in place of parsing and fitting the CSV. Different files are built
+    concurrently; callers wanting the same file wait for a single build.
+    """
+    key, signature = _index_key(filepath, search_cols)
+    with _index_lock:
+        cached = _cached_index(key, signature)
+        if cached is not None:
+            return cached
+        build_lock = _build_locks.setdefault(key, threading.Lock())
+
+    with build_lock:
+        with _index_lock:
+            cached = _cached_index(key, signature)
+        if cached is not None:
+            return cached
+        data, bm25 = _build_index(filepath, search_cols)
+        with _index_lock:
+            _index_cache[key] = (signature, data, bm25)
+            _index_cache.move_to_end(key)
+            while len(_index_cache) > INDEX_CACHE_SIZE:
+                _index_cache.popitem(last=False)
+            _build_locks.pop(key, None)
+    return data, bm25
+
+
+def _build_index(filepath, search_cols):
+    # Prefer a precompiled on-disk index (see index_store.py) when fresh
+    from index_store import load_index
+    mapped = load_index(filepath, search_cols)
+    if mapped is not None:
+        return mapped
+
+    # Tokenize search columns row by row; rows are re-read by offset on hit
+    offsets = array('Q')
+    bm25 = BM25()
+    bm25.fit(_iter_documents(filepath, search_cols, offsets))
+    return CsvRows(filepath, offsets), bm25
+
+
+def _is_index_cached(filepath, search_cols):
+    """True if _get_index would answer from memory"""
+    key, signature = _index_key(filepath, search_cols)
+    with _index_lock:
+        entry = _index_cache.get(key)
+    return entry is not None and entry[0] == signature
+
+
+def is_domain_cached(domain):
+    """True if searching domain would not build an index (unknown or missing data counts as cached)"""
+    config = CSV_CONFIG.get(domain)
+    if config is None:
+        return True
+    filepath = _data_path(DATA_DIR, config["file"])
+    return not filepath.exists() or _is_index_cached(filepath, config["search_cols"])
+
+
+def clear_index_cache():
+    """Drop all cached CSV indexes"""
+    with _index_lock:
+        _index_cache.clear()
+
+
 def _search_csv(filepath, search_cols, output_cols, query, max_results):
     """Core search function using BM25"""
     if not filepath.exists():
         return []
 
-    data = _load_csv(filepath)
-
-    # Build documents from search columns
-    documents = [" ".join(str(row.get(col, "")) for col in search_cols) for row in data]
+    data, bm25 = _get_index(filepath, search_cols)
 
     # BM25 search
-    bm25 = BM25()
-    bm25.fit(documents)
-    ranked = bm25.score(query)
+    ranked = bm25.score(query, max_results)
+    return _collect_rows(data, ranked, output_cols)
+
 
-    # Get top results with score > 0
+def _collect_rows(data, ranked, output_cols):
+    """Get top results with score > 0, projected onto output_cols"""
     results = []
-    for idx, score in ranked[:max_results]:
+    for idx, score in ranked:
         if score > 0:
             row = data[idx]
             results.append({col: row.get(col, "") for col in output_cols if col in row})
@@ -187,67 +563,546 @@ def _search_csv(filepath, search_cols, output_cols, query, max_results):
     return results
 
 
+# ============ DOMAIN ROUTING ============
+DOMAIN_KEYWORDS = {
+    "color": ["color", "palette", "hex", "#", "rgb"],
+    "chart": ["chart", "graph", "visualization", "trend", "bar", "pie", "scatter", "heatmap", "funnel"],
+    "landing": ["landing", "page", "cta", "conversion", "hero", "testimonial", "pricing", "section"],
+    "product": ["saas", "ecommerce", "e-commerce", "fintech", "healthcare", "gaming", "portfolio", "crypto", "dashboard"],
+    "style": ["style", "design", "ui", "minimalism", "glassmorphism", "neumorphism", "brutalism", "dark mode", "flat", "aurora", "prompt", "css", "implementation", "variable", "checklist", "tailwind"],
+    "ux": ["ux", "usability", "accessibility", "wcag", "touch", "scroll", "animation", "keyboard", "navigation", "mobile"],
+    "typography": ["font", "typography", "heading", "serif", "sans"],
+    "icons": ["icon", "icons", "lucide", "heroicons", "symbol", "glyph", "pictogram", "svg icon"],
+    "react": ["react", "next.js", "nextjs", "suspense", "memo", "usecallback", "useeffect", "rerender", "bundle", "waterfall", "barrel", "dynamic import", "rsc", "server component"],
+    "web": ["aria", "focus", "outline", "semantic", "virtualize", "autocomplete", "form", "input type", "preconnect"]
+}
+DEFAULT_DOMAIN = "style"
+
+
+class DomainRouter:
+    """Aho-Corasick automaton over every domain keyword.
+
+    Built once; a query is lowered and scanned in a single pass whatever
+    the number of keywords. Like a substring test per keyword, each
+    keyword counts once per query however often (or overlapping) it
+    occurs. The goto function is completed into a DFA over the keyword
+    alphabet, so scanning is one dict lookup per character and any other
+    character returns to the root.
+    """
+
+    def __init__(self, domain_keywords):
+        self.domains = list(domain_keywords)
+        self.keywords = []  # keyword id -> (keyword, domain index)
+        goto, outputs = [{}], [[]]
+        for d, keywords in enumerate(domain_keywords.values()):
+            for keyword in keywords:
+                state = 0
+                for ch in keyword.lower():
+                    nxt = goto[state].get(ch)
+                    if nxt is None:
+                        nxt = goto[state][ch] = len(goto)
+                        goto.append({})
+                        outputs.append([])
+                    state = nxt
+                outputs[state].append(len(self.keywords))
+                self.keywords.append((keyword, d))
+
+        # Breadth-first: fail links, inherited outputs, completed transitions
+        fail = [0] * len(goto)
+        delta = [dict(goto[0])] + [None] * (len(goto) - 1)
+        queue = list(goto[0].values())
+        for state in queue:
+            delta[state] = {**delta[fail[state]], **goto[state]}
+            outputs[state] += outputs[fail[state]]
+            for ch, child in goto[state].items():
+                fail[child] = delta[fail[state]].get(ch, 0)
+                queue.append(child)
+        self._delta = delta
+        self._outputs = [tuple(out) for out in outputs]
+
+    def _matched(self, query):
+        """Ids of the keywords occurring in query"""
+        delta, outputs = self._delta, self._outputs
+        matched = set()
+        state = 0
+        for ch in query.lower():
+            state = delta[state].get(ch, 0)
+            if outputs[state]:
+                matched.update(outputs[state])
+        return matched
+
+    def _hits(self, query):
+        """Distinct keyword hits per domain index"""
+        hits = [0] * len(self.domains)
+        keywords = self.keywords
+        for keyword_id in self._matched(query):
+            hits[keywords[keyword_id][1]] += 1
+        return hits
+
+    def counts(self, query):
+        """{domain: number of distinct keywords of that domain in query}"""
+        return dict(zip(self.domains, self._hits(query)))
+
+    def rank(self, query):
+        """[(domain, confidence)] for domains with hits, best first.
+
+        confidence is the domain's share of all keyword hits; ties keep
+        the keyword table's domain order.
+        """
+        counts = self.counts(query)
+        total = sum(counts.values())
+        ranked = sorted((domain for domain in self.domains if counts[domain]), key=lambda d: -counts[d])
+        return [(domain, counts[domain] / total) for domain in ranked]
+
+    def route(self, query, default=DEFAULT_DOMAIN):
+        """Best domain for query, or default when no keyword matches"""
+        hits = self._hits(query)
+        best = max(range(len(hits)), key=hits.__getitem__)  # first domain wins ties
+        return self.domains[best] if hits[best] else default
+
+
+DOMAIN_ROUTER = DomainRouter(DOMAIN_KEYWORDS)
+
+
 def detect_domain(query):
     """Auto-detect the most relevant domain from query"""
-    query_lower = query.lower()
-
-    domain_keywords = {
-        "color": ["color", "palette", "hex", "#", "rgb"],
-        "chart": ["chart", "graph", "visualization", "trend", "bar", "pie", "scatter", "heatmap", "funnel"],
-        "landing": ["landing", "page", "cta", "conversion", "hero", "testimonial", "pricing", "section"],
-        "product": ["saas", "ecommerce", "e-commerce", "fintech", "healthcare", "gaming", "portfolio", "crypto", "dashboard"],
-        "style": ["style", "design", "ui", "minimalism", "glassmorphism", "neumorphism", "brutalism", "dark mode", "flat", "aurora", "prompt", "css", "implementation", "variable", "checklist", "tailwind"],
-        "ux": ["ux", "usability", "accessibility", "wcag", "touch", "scroll", "animation", "keyboard", "navigation", "mobile"],
-        "typography": ["font", "typography", "heading", "serif", "sans"],
-        "icons": ["icon", "icons", "lucide", "heroicons", "symbol", "glyph", "pictogram", "svg icon"],
-        "react": ["react", "next.js", "nextjs", "suspense", "memo", "usecallback", "useeffect", "rerender", "bundle", "waterfall", "barrel", "dynamic import", "rsc", "server component"],
-        "web": ["aria", "focus", "outline", "semantic", "virtualize", "autocomplete", "form", "input type", "preconnect"]
-    }
-
-    scores = {domain: sum(1 for kw in keywords if kw in query_lower) for domain, keywords in domain_keywords.items()}
-    best = max(scores, key=scores.get)
-    return best if scores[best] > 0 else "style"
+    return DOMAIN_ROUTER.route(query)
 
 
-def search(query, domain=None, max_results=MAX_RESULTS):
-    """Main search function with auto-domain detection"""
+def rank_domains(query):
+    """Domains matching query as [(domain, confidence)], best first"""
+    return DOMAIN_ROUTER.rank(query)
+
+
+@lru_cache(maxsize=None)
+def _data_path(data_dir, name):
+    """data_dir / name, built once per configured file"""
+    return data_dir / name
+
+
+def _plan_search(query, domain=None):
+    """Resolve a domain query to (target, envelope).
+
+    target is (filepath, search_cols, output_cols), or None when the data
+    file is missing, in which case envelope is the error result.
+    """
     if domain is None:
         domain = detect_domain(query)
 
     config = CSV_CONFIG.get(domain, CSV_CONFIG["style"])
-    filepath = DATA_DIR / config["file"]
+    filepath = _data_path(DATA_DIR, config["file"])
 
     if not filepath.exists():
-        return {"error": f"File not found: {filepath}", "domain": domain}
+        return None, {"error": f"File not found: {filepath}", "domain": domain}
 
-    results = _search_csv(filepath, config["search_cols"], config["output_cols"], query, max_results)
+    target = (filepath, config["search_cols"], config["output_cols"])
+    return target, {"domain": domain, "query": query, "file": config["file"]}
+
+
+def _plan_search_stack(query, stack):
+    """Resolve a stack query to (target, envelope); see _plan_search"""
+    if stack not in STACK_CONFIG:
+        return None, {"error": f"Unknown stack: {stack}. Available: {', '.join(AVAILABLE_STACKS)}"}
+
+    filepath = _data_path(DATA_DIR, STACK_CONFIG[stack]["file"])
+
+    if not filepath.exists():
+        return None, {"error": f"Stack file not found: {filepath}", "stack": stack}
 
-    return {
-        "domain": domain,
-        "query": query,
-        "file": config["file"],
-        "count": len(results),
-        "results": results
-    }
+    target = (filepath, _STACK_COLS["search_cols"], _STACK_COLS["output_cols"])
+    return target, {"domain": "stack", "stack": stack, "query": query, "file": STACK_CONFIG[stack]["file"]}
+
+
+def search(query, domain=None, max_results=MAX_RESULTS):
+    """Main search function with auto-domain detection"""
+    target, envelope = _plan_search(query, domain)
+    if target is None:
+        return envelope
+
+    results = _cached_search(("search", envelope["domain"]), target, query, max_results)
+    return {**envelope, "count": len(results), "results": results}
 
 
 def search_stack(query, stack, max_results=MAX_RESULTS):
     """Search stack-specific guidelines"""
-    if stack not in STACK_CONFIG:
-        return {"error": f"Unknown stack: {stack}. Available: {', '.join(AVAILABLE_STACKS)}"}
+    target, envelope = _plan_search_stack(query, stack)
+    if target is None:
+        return envelope
 
-    filepath = DATA_DIR / STACK_CONFIG[stack]["file"]
+    results = _cached_search(("stack", stack), target, query, max_results)
+    return {**envelope, "count": len(results), "results": results}
 
-    if not filepath.exists():
-        return {"error": f"Stack file not found: {filepath}", "stack": stack}
-
-    results = _search_csv(filepath, _STACK_COLS["search_cols"], _STACK_COLS["output_cols"], query, max_results)
-
-    return {
-        "domain": "stack",
-        "stack": stack,
-        "query": query,
-        "file": STACK_CONFIG[stack]["file"],
-        "count": len(results),
-        "results": results
-    }
+
+# ============ RESULT CACHE ============
+class ResultCache:
+    """Thread-safe LRU of search answers with a TTL and an optional disk store.
+
+    Keys are hashable tuples; values must be JSON-serializable when a path
+    is given. The store is read on first use and written back at exit (only
+    the newest persist_max live entries), so warm answers survive across
+    CLI invocations. Expiry uses wall-clock time for the same reason.
+    """
+
+    def __init__(self, maxsize=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL, path=None,
+                 persist_max=RESULT_CACHE_PERSIST_MAX):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.path = Path(path) if path else None
+        self.persist_max = persist_max
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (expires, value)
+        self._lock = threading.Lock()
+        self._loaded = self.path is None
+        self._dirty = False
+
+    def get(self, key):
+        """Cached value for key, or None on a miss or an expired entry"""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            self._dirty = True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+            self._dirty = self.path is not None
+
+    def info(self):
+        """Hit/miss counters and bounds, like functools' cache_info()"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries),
+                    "maxsize": self.maxsize, "ttl": self.ttl}
+
+    def _load(self):
+        self._loaded = True
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            now = time.time()
+            entries = [(_freeze(key), expires, value) for key, expires, value in stored["entries"]
+                       if expires > now]
+        except (OSError, ValueError, TypeError, KeyError):  # missing or corrupt store starts empty
+            return
+        for key, expires, value in entries:
+            self._entries[key] = (expires, value)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def save(self):
+        """Write live entries to the store (no-op without a path or changes)"""
+        if self.path is None:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            now = time.time()
+            live = [[key, expires, value] for key, (expires, value) in self._entries.items() if expires > now]
+            self._dirty = False
+        payload = json.dumps({"entries": live[-self.persist_max:]}, ensure_ascii=False, separators=(',', ':'))
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            os.replace(tmp_path, self.path)
+        except OSError:  # a cache that cannot be written is just not persisted
+            pass
+
+
+def _freeze(value):
+    """JSON lists back into the tuples a cache key was built from"""
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+_result_cache = ResultCache(path=os.environ.get(RESULT_CACHE_ENV) or None)
+atexit.register(_result_cache.save)
+
+
+def _cached_search(source, target, query, max_results):
+    """_search_csv through the result cache.
+
+    The key is (source, index version, token multiset, max_results): the
+    source names the domain or stack, the version is the CSV's mtime and
+    size, and queries with the same tokens in any order, case or
+    punctuation score identically, so they share one entry. Rows are
+    copied out so callers cannot mutate the cached answer.
+    """
+    filepath = target[0]
+    try:
+        stat = filepath.stat()
+    except OSError:
+        return []
+    key = (source, stat.st_mtime_ns, stat.st_size, tuple(sorted(DEFAULT_TOKENIZER(query))), max_results)
+    results = _result_cache.get(key)
+    if results is None:
+        results = _search_csv(*target, query, max_results)
+        _result_cache.put(key, results)
+    return [dict(row) for row in results]
+
+
+def result_cache_info():
+    """Hit/miss counters and size of the search result cache"""
+    return _result_cache.info()
+
+
+def clear_result_cache():
+    """Drop all cached search answers"""
+    _result_cache.clear()
+
+
+# ============ BATCH SEARCH ============
+BATCH_CHUNK = 1000  # Requests grouped per index pass; bounds buffered output
+
+
+def search_batch(requests, chunk_size=BATCH_CHUNK):
+    """Run many searches, yielding results in input order.
+
+    Each request is a dict with "query", optional "domain" or "stack"
+    (stack wins, as on the CLI) and optional "max_results". Requests are
+    grouped by target file so each index is fetched once and all of its
+    queries are scored together.
+    """
+    requests = iter(requests)
+    while True:
+        chunk = list(islice(requests, chunk_size))
+        if not chunk:
+            return
+        yield from _search_chunk(chunk)
+
+
+def _parse_max_results(value):
+    """A request's max_results as an int (ints, integral floats, digit strings); None if invalid"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else None
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            return None
+    return None
+
+
+def _search_chunk(chunk):
+    results = [None] * len(chunk)
+    groups = defaultdict(list)
+
+    for i, request in enumerate(chunk):
+        if isinstance(request, dict) and "error" in request and "query" not in request:
+            results[i] = request  # upstream parse error keeps its position
+            continue
+        if not isinstance(request, dict) or not request.get("query"):
+            results[i] = {"error": "Batch request needs a non-empty 'query'"}
+            continue
+        max_results = _parse_max_results(request.get("max_results", MAX_RESULTS))
+        if max_results is None:
+            results[i] = {"error": f"Batch request 'max_results' must be an integer, got {request['max_results']!r}"}
+            continue
+        query = str(request["query"])
+        if request.get("stack"):
+            target, envelope = _plan_search_stack(query, request["stack"])
+        else:
+            target, envelope = _plan_search(query, request.get("domain"))
+        if target is None:
+            results[i] = envelope
+            continue
+        key = (target[0], tuple(target[1]), tuple(target[2]))
+        groups[key].append((i, query, max(0, max_results), envelope))
+
+    for (filepath, search_cols, output_cols), members in groups.items():
+        data, bm25 = _get_index(filepath, search_cols)
+        ranked = bm25.score_batch([query for _, query, _, _ in members],
+                                  max(max_results for _, _, max_results, _ in members))
+        for (i, _, max_results, envelope), hits in zip(members, ranked):
+            rows = _collect_rows(data, hits[:max_results], output_cols)
+            results[i] = {**envelope, "count": len(rows), "results": rows}
+
+    return results
+
+
+# ============ FEDERATED SEARCH ============
+def _federated_targets(stacks=False):
+    """[(label, filepath, search_cols, output_cols)] for every existing data file"""
+    targets = [(domain, _data_path(DATA_DIR, config["file"]), config["search_cols"], config["output_cols"])
+               for domain, config in CSV_CONFIG.items()]
+    if stacks:
+        targets += [(f"stack:{stack}", _data_path(DATA_DIR, config["file"]),
+                     _STACK_COLS["search_cols"], _STACK_COLS["output_cols"])
+                    for stack, config in STACK_CONFIG.items()]
+    return [target for target in targets if target[1].exists()]
+
+
+def search_all(query, max_results=MAX_RESULTS, stacks=False):
+    """Search every domain (and every stack with stacks=True) in one ranking.
+
+    Raw BM25 scores depend on each corpus' size and vocabulary, so every
+    hit is divided by its corpus' max_score(query): the share of the best
+    score the query could reach there, in [0, 1]. That map is monotonic
+    within a corpus, so each index only returns its own top max_results
+    before the merge. Hits carry their "source" (a domain, or
+    "stack:<name>") and normalized "score". Indexes not yet in memory are
+    loaded concurrently; warm ones are scored inline, which is cheaper
+    than dispatching them to threads.
+    """
+    targets = _federated_targets(stacks)
+    cold = [target for target in targets if not _is_index_cached(target[1], target[2])]
+    if len(cold) > 1:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=len(cold)) as pool:
+            list(pool.map(lambda target: _get_index(target[1], target[2]), cold))
+
+    indexes, hits = [], []
+    for order, (_, filepath, search_cols, _) in enumerate(targets):
+        data, bm25 = _get_index(filepath, search_cols)
+        indexes.append(data)
+        bound = bm25.max_score(query)
+        for idx, score in bm25.score(query, max_results):
+            if score > 0:
+                hits.append((-score / bound, order, idx))
+
+    results = []
+    for neg_score, order, idx in heapq.nsmallest(max(0, max_results), hits):
+        label, _, _, output_cols = targets[order]
+        row = indexes[order][idx]
+        results.append({"source": label, "score": round(-neg_score, 4),
+                        **{col: row.get(col, "") for col in output_cols if col in row}})
+    return {"domain": "all", "query": query, "sources": [target[0] for target in targets],
+            "count": len(results), "results": results}
+
+
+# ============ MULTI-STACK SEARCH ============
+class FacetedIndex:
+    """One BM25 index over several CSVs sharing search columns.
+
+    Every document keeps the position of its source file as a facet, so a
+    query is scored in a single pass over one set of postings - each list
+    cut to the doc ranges of the selected facets - and then split into a
+    top-k per facet. IDF and document lengths are shared by
+    all sources, which keeps scores comparable between them.
+    """
+
+    def __init__(self, names, bm25, facets, rows):
+        self.names = names
+        self.facet_ids = {name: facet for facet, name in enumerate(names)}
+        self.bm25 = bm25
+        self.facets = facets  # doc -> facet (position in names)
+        self.rows = rows  # facet -> CsvRows
+        self.starts = [0] * len(names)  # facet -> its first doc
+        for facet in range(1, len(names)):
+            self.starts[facet] = self.starts[facet - 1] + len(rows[facet - 1])
+
+    @classmethod
+    def build(cls, sources, search_cols):
+        """Fit over [(name, filepath)] in order"""
+        names, rows, facets = [], [], array('H')
+
+        def documents():
+            for facet, (name, filepath) in enumerate(sources):
+                offsets = array('Q')
+                names.append(name)
+                rows.append(CsvRows(filepath, offsets))
+                for document in _iter_documents(filepath, search_cols, offsets):
+                    facets.append(facet)
+                    yield document
+
+        bm25 = BM25()  # scored one query at a time, so no term x doc matrix
+        bm25.fit(documents())
+        return cls(names, bm25, facets, rows)
+
+    def row(self, doc):
+        facet = self.facets[doc]
+        return self.rows[facet][doc - self.starts[facet]]
+
+    def score(self, query, top_k=None, facets=None):
+        """{facet name: [(doc, score)]} ranked like BM25.score.
+
+        facets restricts the pass to the named sources (default: all); a
+        selected source without hits maps to an empty list.
+        """
+        selected = self.names if facets is None else facets
+        ranges = None
+        if facets is not None:  # a facet's documents are contiguous
+            ranges = sorted((self.starts[facet], self.starts[facet] + len(self.rows[facet]))
+                            for facet in {self.facet_ids[name] for name in facets})
+
+        grouped = defaultdict(list)
+        if self.bm25.N:
+            facet_of = self.facets
+            for doc, score in self.bm25._accumulate(query, ranges).items():
+                grouped[facet_of[doc]].append((doc, score))
+
+        ranked = {}
+        for name in selected:
+            hits = grouped.get(self.facet_ids[name], [])
+            ranked[name] = (sorted(hits, key=_rank_key) if top_k is None
+                            else heapq.nsmallest(top_k, hits, key=_rank_key))
+        return ranked
+
+
+_stacks_index = None  # (signatures, FacetedIndex) over every stack file
+_stacks_lock = threading.Lock()
+
+
+def _get_stacks_index():
+    """FacetedIndex over all existing stack CSVs, rebuilt when any of them changes"""
+    global _stacks_index
+    sources = [(stack, _data_path(DATA_DIR, config["file"])) for stack, config in STACK_CONFIG.items()]
+    sources = [(stack, filepath) for stack, filepath in sources if filepath.exists()]
+    signatures = tuple(_index_key(filepath, _STACK_COLS["search_cols"]) for _, filepath in sources)
+    with _stacks_lock:
+        if _stacks_index is None or _stacks_index[0] != signatures:
+            _stacks_index = (signatures, FacetedIndex.build(sources, _STACK_COLS["search_cols"]))
+        return _stacks_index[1]
+
+
+def search_stacks(query, stacks="all", max_results=MAX_RESULTS):
+    """Compare stack guidelines: top max_results per stack from one scoring pass.
+
+    stacks is a list of stack names, one name, or "all". Results map each stack to its
+    rows, each with its BM25 "score" from the combined index (comparable
+    across stacks; per-stack order can differ slightly from search_stack,
+    whose IDF only sees one file).
+    """
+    if isinstance(stacks, str):
+        stacks = AVAILABLE_STACKS if stacks == "all" else [stacks]
+    unknown = [stack for stack in stacks if stack not in STACK_CONFIG]
+    if unknown:
+        return {"error": f"Unknown stack: {', '.join(unknown)}. Available: {', '.join(AVAILABLE_STACKS)}"}
+
+    index = _get_stacks_index()
+    stacks = [stack for stack in dict.fromkeys(stacks) if stack in index.facet_ids]
+    output_cols = _STACK_COLS["output_cols"]
+    results = {}
+    for stack, ranked in index.score(query, max(0, max_results), stacks).items():
+        rows = []
+        for doc, score in ranked:
+            row = index.row(doc)
+            rows.append({"score": round(score, 4), **{col: row.get(col, "") for col in output_cols if col in row}})
+        results[stack] = rows
+    return {"domain": "stack", "query": query, "stacks": stacks,
+            "count": sum(len(rows) for rows in results.values()), "results": results}
@@ -11,14 +11,21 @@ Usage:
     # With persistence (Master + Overrides pattern)
     result = generate_design_system("SaaS dashboard", "My Project", persist=True)
     result = generate_design_system("SaaS dashboard", "My Project", persist=True, page="dashboard")
+
+    # Many projects and pages in one pass
+    result = generate_design_systems_bulk(manifest, output_dir="apps")
 """
 
 import csv
 import json
+from bisect import bisect_right
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from core import search, DATA_DIR
+from core import search, is_domain_cached, DATA_DIR, MAX_RESULTS
 
 
 # ============ CONFIGURATION ============
@@ -33,12 +40,116 @@ SEARCH_CONFIG = {
 }
 
 
+# ============ REASONING INDEX ============
+class ReasoningIndex:
+    """Compiled lookup over ui-reasoning.csv rules.
+
+    Reproduces the rule precedence of a linear scan - first exact
+    UI_Category match, then first partial (substring either way) match,
+    then first rule with a UI_Category keyword inside the category - from
+    dict lookups over the query's substrings instead of scanning rules.
+    Decision_Rules JSON is parsed once per rule.
+    """
+
+    def __init__(self, rules: list):
+        self.exact = {}      # ui_cat -> first rule index
+        self.exact_trie = {}  # character tries for "key occurs inside category"
+        self.keyword_trie = {}
+        self.reasoning = []
+        ui_cats = []
+
+        for idx, rule in enumerate(rules):
+            ui_cat = (rule.get("UI_Category") or "").lower()
+            self.exact.setdefault(ui_cat, idx)
+            ui_cats.append(ui_cat)
+            self._trie_insert(self.exact_trie, ui_cat, idx)
+            for kw in ui_cat.replace("/", " ").replace("-", " ").split():
+                self._trie_insert(self.keyword_trie, kw, idx)
+            self.reasoning.append(self._compile_rule(rule))
+
+        # "category inside ui_cat": the first hit in the joined categories is
+        # the first rule, and bisecting the start offsets recovers its index
+        self._joined = "\x00".join(ui_cats)
+        self._starts = []
+        offset = 0
+        for ui_cat in ui_cats:
+            self._starts.append(offset)
+            offset += len(ui_cat) + 1
+
+    @staticmethod
+    def _compile_rule(rule: dict) -> dict:
+        # Parse decision rules JSON
+        decision_rules = {}
+        try:
+            decision_rules = json.loads(rule.get("Decision_Rules", "{}"))
+        except json.JSONDecodeError:
+            pass
+
+        return {
+            "pattern": rule.get("Recommended_Pattern", ""),
+            "style_priority": [s.strip() for s in rule.get("Style_Priority", "").split("+")],
+            "color_mood": rule.get("Color_Mood", ""),
+            "typography_mood": rule.get("Typography_Mood", ""),
+            "key_effects": rule.get("Key_Effects", ""),
+            "anti_patterns": rule.get("Anti_Patterns", ""),
+            "decision_rules": decision_rules,
+            "severity": rule.get("Severity", "MEDIUM")
+        }
+
+    @staticmethod
+    def _trie_insert(trie: dict, key: str, idx: int):
+        node = trie
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node.setdefault(None, idx)  # None marks end of key; keep first rule
+
+    @staticmethod
+    def _first_contained(text: str, trie: dict):
+        """Lowest rule index among trie keys occurring as substrings of text."""
+        best = trie.get(None)
+        for start in range(len(text)):
+            node = trie
+            for ch in text[start:]:
+                node = node.get(ch)
+                if node is None:
+                    break
+                idx = node.get(None)
+                if idx is not None and (best is None or idx < best):
+                    best = idx
+        return best
+
+    def _first_containing(self, category_lower: str):
+        """Lowest rule index whose ui_cat contains category_lower."""
+        if not self._starts or "\x00" in category_lower:
+            return None
+        pos = self._joined.find(category_lower)
+        return bisect_right(self._starts, pos) - 1 if pos >= 0 else None
+
+    def find(self, category: str):
+        """Index of the matching rule, or None."""
+        category_lower = category.lower()
+
+        idx = self.exact.get(category_lower)
+        if idx is not None:
+            return idx
+
+        # Partial: ui_cat inside category, or category inside ui_cat
+        partial = [i for i in (self._first_contained(category_lower, self.exact_trie),
+                               self._first_containing(category_lower)) if i is not None]
+        if partial:
+            return min(partial)
+
+        return self._first_contained(category_lower, self.keyword_trie)
+
+
 # ============ DESIGN SYSTEM GENERATOR ============
 class DesignSystemGenerator:
     """Generates design system recommendations from aggregated searches."""
 
-    def __init__(self):
+    def __init__(self, search_fn=None):
         self.reasoning_data = self._load_reasoning()
+        self.reasoning_index = ReasoningIndex(self.reasoning_data)
+        self.search = search_fn or search
 
     def _load_reasoning(self) -> list:
         """Load reasoning rules from CSV."""
@@ -48,48 +159,47 @@ class DesignSystemGenerator:
         with open(filepath, 'r', encoding='utf-8') as f:
             return list(csv.DictReader(f))
 
-    def _multi_domain_search(self, query: str, style_priority: list = None) -> dict:
-        """Execute searches across multiple domains."""
-        results = {}
+    def _multi_domain_search(self, query: str, style_priority: list = None, exclude: tuple = ()) -> tuple:
+        """Execute searches across multiple domains.
+
+        Searches fan out to threads only while two or more domain indexes
+        still have to be built; warm BM25 scoring holds the GIL, so it runs
+        inline. Returns (results, timings) where timings maps domain ->
+        milliseconds.
+        """
+        jobs = {}
         for domain, config in SEARCH_CONFIG.items():
+            if domain in exclude:
+                continue
             if domain == "style" and style_priority:
                 # For style, also search with priority keywords
                 priority_query = " ".join(style_priority[:2]) if style_priority else query
-                combined_query = f"{query} {priority_query}"
-                results[domain] = search(combined_query, domain, config["max_results"])
+                jobs[domain] = (f"{query} {priority_query}", domain, config["max_results"])
             else:
-                results[domain] = search(query, domain, config["max_results"])
-        return results
+                jobs[domain] = (query, domain, config["max_results"])
 
-    def _find_reasoning_rule(self, category: str) -> dict:
-        """Find matching reasoning rule for a category."""
-        category_lower = category.lower()
-
-        # Try exact match first
-        for rule in self.reasoning_data:
-            if rule.get("UI_Category", "").lower() == category_lower:
-                return rule
-
-        # Try partial match
-        for rule in self.reasoning_data:
-            ui_cat = rule.get("UI_Category", "").lower()
-            if ui_cat in category_lower or category_lower in ui_cat:
-                return rule
+        cold = [domain for domain in jobs if not is_domain_cached(domain)]
+        if len(cold) > 1:
+            with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+                futures = {domain: pool.submit(_timed_search, self.search, *job) for domain, job in jobs.items()}
+                done = {domain: future.result() for domain, future in futures.items()}
+        else:
+            done = {domain: _timed_search(self.search, *job) for domain, job in jobs.items()}
 
-        # Try keyword match
-        for rule in self.reasoning_data:
-            ui_cat = rule.get("UI_Category", "").lower()
-            keywords = ui_cat.replace("/", " ").replace("-", " ").split()
-            if any(kw in category_lower for kw in keywords):
-                return rule
+        results = {domain: result for domain, (result, _) in done.items()}
+        timings = {domain: ms for domain, (_, ms) in done.items()}
+        return results, timings
 
-        return {}
+    def _find_reasoning_rule(self, category: str) -> dict:
+        """Find matching reasoning rule for a category (exact > partial > keyword)."""
+        idx = self.reasoning_index.find(category)
+        return self.reasoning_data[idx] if idx is not None else {}
 
     def _apply_reasoning(self, category: str, search_results: dict) -> dict:
         """Apply reasoning rules to search results."""
-        rule = self._find_reasoning_rule(category)
+        idx = self.reasoning_index.find(category)
 
-        if not rule:
+        if idx is None:
             return {
                 "pattern": "Hero + Features + CTA",
                 "style_priority": ["Minimalism", "Flat Design"],
@@ -101,22 +211,11 @@ class DesignSystemGenerator:
                 "severity": "MEDIUM"
             }
 
-        # Parse decision rules JSON
-        decision_rules = {}
-        try:
-            decision_rules = json.loads(rule.get("Decision_Rules", "{}"))
-        except json.JSONDecodeError:
-            pass
-
+        reasoning = self.reasoning_index.reasoning[idx]
         return {
-            "pattern": rule.get("Recommended_Pattern", ""),
-            "style_priority": [s.strip() for s in rule.get("Style_Priority", "").split("+")],
-            "color_mood": rule.get("Color_Mood", ""),
-            "typography_mood": rule.get("Typography_Mood", ""),
-            "key_effects": rule.get("Key_Effects", ""),
-            "anti_patterns": rule.get("Anti_Patterns", ""),
-            "decision_rules": decision_rules,
-            "severity": rule.get("Severity", "MEDIUM")
+            **reasoning,
+            "style_priority": list(reasoning["style_priority"]),
+            "decision_rules": dict(reasoning["decision_rules"])
         }
 
     def _select_best_match(self, results: list, priority_keywords: list) -> dict:
@@ -163,7 +262,7 @@ class DesignSystemGenerator:
     def generate(self, query: str, project_name: str = None) -> dict:
         """Generate complete design system recommendation."""
         # Step 1: First search product to get category
-        product_result = search(query, "product", 1)
+        product_result, product_ms = _timed_search(self.search, query, "product", SEARCH_CONFIG["product"]["max_results"])
         product_results = product_result.get("results", [])
         category = "General"
         if product_results:
@@ -173,9 +272,10 @@ class DesignSystemGenerator:
         reasoning = self._apply_reasoning(category, {})
         style_priority = reasoning.get("style_priority", [])
 
-        # Step 3: Multi-domain search with style priority hints
-        search_results = self._multi_domain_search(query, style_priority)
-        search_results["product"] = product_result  # Reuse product search
+        # Step 3: Multi-domain search with style priority hints (product already searched)
+        search_results, timings = self._multi_domain_search(query, style_priority, exclude=("product",))
+        search_results["product"] = product_result
+        timings = {"product": product_ms, **timings}
 
         # Step 4: Select best matches from each domain using priority
         style_results = self._extract_results(search_results.get("style", {}))
@@ -232,10 +332,18 @@ class DesignSystemGenerator:
             "key_effects": combined_effects,
             "anti_patterns": reasoning.get("anti_patterns", ""),
             "decision_rules": reasoning.get("decision_rules", {}),
-            "severity": reasoning.get("severity", "MEDIUM")
+            "severity": reasoning.get("severity", "MEDIUM"),
+            "timings_ms": timings
         }
 
 
+def _timed_search(search_fn, query: str, domain: str, max_results: int) -> tuple:
+    """Run one domain search and return (result, elapsed milliseconds)."""
+    start = time.perf_counter()
+    result = search_fn(query, domain, max_results)
+    return result, round((time.perf_counter() - start) * 1000, 3)
+
+
 # ============ OUTPUT FORMATTERS ============
 BOX_WIDTH = 90  # Wider box for more content
 
@@ -460,7 +568,8 @@ def format_markdown(design_system: dict) -> str:
 
 # ============ MAIN ENTRY POINT ============
 def generate_design_system(query: str, project_name: str = None, output_format: str = "ascii", 
-                           persist: bool = False, page: str = None, output_dir: str = None) -> str:
+                           persist: bool = False, page: str = None, output_dir: str = None,
+                           generator: DesignSystemGenerator = None) -> str:
     """
     Main entry point for design system generation.
 
@@ -471,11 +580,12 @@ def generate_design_system(query: str, project_name: str = None, output_format:
         persist: If True, save design system to design-system/ folder
         page: Optional page name for page-specific override file
         output_dir: Optional output directory (defaults to current working directory)
+        generator: Optional pre-built generator to reuse (keeps reasoning rules loaded)
 
     Returns:
         Formatted design system string
     """
-    generator = DesignSystemGenerator()
+    generator = generator or DesignSystemGenerator()
     design_system = generator.generate(query, project_name)
     
     # Persist to files if requested
@@ -539,6 +649,138 @@ def persist_design_system(design_system: dict, page: str = None, output_dir: str
     }
 
 
+# ============ BULK GENERATION ============
+class SearchMemo:
+    """Thread-safe memo around core.search shared by one bulk run.
+
+    Identical (query, domain, max_results) sub-queries issued by different
+    projects and pages are searched once.
+    """
+
+    def __init__(self, search_fn=None):
+        self._search = search_fn or search
+        self._results = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, query: str, domain: str = None, max_results: int = MAX_RESULTS) -> dict:
+        key = (query, domain, max_results)
+        with self._lock:
+            if key in self._results:
+                self.hits += 1
+                return self._results[key]
+            self.misses += 1
+        result = self._search(query, domain, max_results)
+        with self._lock:
+            return self._results.setdefault(key, result)
+
+
+def _slug(name: str) -> str:
+    return name.lower().replace(' ', '-')
+
+
+def _normalize_manifest(manifest: dict) -> list:
+    """Expand a bulk manifest into [(project_name, query, [(page, page_query), ...])].
+
+    Raises ValueError for a project without a query or a page without a
+    name, and for projects (or pages of one project) whose names map to
+    the same directory (or file), since their writes would overwrite
+    each other.
+    """
+    projects, project_slugs = [], {}
+    for i, project in enumerate(manifest.get("projects", []), start=1):
+        name, query = project.get("name"), project.get("query")
+        if not query:
+            raise ValueError(f"Project {i} ({name or 'unnamed'}) has no 'query'")
+        slug = _slug(name or query.upper())
+        if slug in project_slugs:
+            raise ValueError(f"Projects {project_slugs[slug]} and {i} both write design-system/{slug}/")
+        project_slugs[slug] = i
+
+        pages, page_slugs = [], set()
+        for page in project.get("pages", []):
+            if isinstance(page, str):
+                page_name, page_query = page, query
+            else:
+                page_name, page_query = page.get("name"), page.get("query") or query
+            if not page_name:
+                raise ValueError(f"Project {i} ({slug}) has a page without a 'name'")
+            if _slug(page_name) in page_slugs:
+                raise ValueError(f"Project {i} ({slug}) lists page '{_slug(page_name)}' twice")
+            page_slugs.add(_slug(page_name))
+            pages.append((page_name, page_query))
+        projects.append((name, query, pages))
+    return projects
+
+
+def generate_design_systems_bulk(manifest: dict, output_dir: str = None, workers: int = None) -> list:
+    """
+    Generate and persist design systems for many projects and pages in one pass.
+
+    Args:
+        manifest: {"projects": [{"name": "My App", "query": "SaaS dashboard",
+                  "pages": ["settings", {"name": "dashboard", "query": "analytics charts"}]}]}
+                  Pages without a query use the project query.
+        output_dir: Optional output directory (defaults to current working directory)
+        workers: Optional worker pool size
+
+    Returns:
+        list of persistence results (one per project, as from persist_design_system)
+    """
+    projects = _normalize_manifest(manifest)
+    memo = SearchMemo()
+    generator = DesignSystemGenerator(search_fn=memo)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Projects sharing a query share one generated design system
+        queries = {query for _, query, _ in projects}
+        generated = dict(zip(queries, pool.map(generator.generate, queries)))
+
+        design_systems = []
+        for project_name, query, _ in projects:
+            design_system = dict(generated[query])
+            design_system["project_name"] = project_name or query.upper()
+            design_systems.append(design_system)
+
+        # One write task per MASTER.md / page override, all on the same pool
+        results, writes = [], []
+        for design_system, (_, _, pages) in zip(design_systems, projects):
+            design_system_dir = _project_dir(design_system, output_dir)
+            (design_system_dir / "pages").mkdir(parents=True, exist_ok=True)
+            results.append({
+                "status": "success",
+                "design_system_dir": str(design_system_dir),
+                "created_files": []
+            })
+            writes.append((results[-1], pool.submit(
+                _write_file, design_system_dir / "MASTER.md", format_master_md, design_system)))
+            for page, page_query in pages:
+                page_file = design_system_dir / "pages" / f"{_slug(page)}.md"
+                writes.append((results[-1], pool.submit(
+                    _write_file, page_file, format_page_override_md, design_system, page, page_query, memo)))
+
+        for result, future in writes:
+            result["created_files"].append(future.result())
+
+    return results
+
+
+def _project_dir(design_system: dict, output_dir: str = None) -> Path:
+    """design-system/<project-slug>/ under output_dir (or the cwd)."""
+    base_dir = Path(output_dir) if output_dir else Path.cwd()
+    project_slug = _slug(design_system.get("project_name", "default"))
+    return base_dir / "design-system" / project_slug
+
+
+def _write_file(path: Path, formatter, *args) -> str:
+    """Render content with formatter(*args) and write it to path."""
+    content = formatter(*args)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return str(path)
+
+
 def format_master_md(design_system: dict) -> str:
     """Format design system as MASTER.md with hierarchical override logic."""
     project = design_system.get("project_name", "PROJECT")
@@ -802,14 +1044,14 @@ def format_master_md(design_system: dict) -> str:
     return "\n".join(lines)
 
 
-def format_page_override_md(design_system: dict, page_name: str, page_query: str = None) -> str:
+def format_page_override_md(design_system: dict, page_name: str, page_query: str = None, search_fn=None) -> str:
     """Format a page-specific override file with intelligent AI-generated content."""
     project = design_system.get("project_name", "PROJECT")
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     page_title = page_name.replace("-", " ").replace("_", " ").title()
     
     # Detect page type and generate intelligent overrides
-    page_overrides = _generate_intelligent_overrides(page_name, page_query, design_system)
+    page_overrides = _generate_intelligent_overrides(page_name, page_query, design_system, search_fn)
     
     lines = []
     
@@ -911,23 +1153,23 @@ def format_page_override_md(design_system: dict, page_name: str, page_query: str
     return "\n".join(lines)
 
 
-def _generate_intelligent_overrides(page_name: str, page_query: str, design_system: dict) -> dict:
+def _generate_intelligent_overrides(page_name: str, page_query: str, design_system: dict, search_fn=None) -> dict:
     """
     Generate intelligent overrides based on page type using layered search.
     
     Uses the existing search infrastructure to find relevant style, UX, and layout
     data instead of hardcoded page types.
     """
-    from core import search
+    search_fn = search_fn or search
     
     page_lower = page_name.lower()
     query_lower = (page_query or "").lower()
     combined_context = f"{page_lower} {query_lower}"
     
     # Search across multiple domains for page-specific guidance
-    style_search = search(combined_context, "style", max_results=1)
-    ux_search = search(combined_context, "ux", max_results=3)
-    landing_search = search(combined_context, "landing", max_results=1)
+    style_search = search_fn(combined_context, "style", max_results=1)
+    ux_search = search_fn(combined_context, "ux", max_results=3)
+    landing_search = search_fn(combined_context, "landing", max_results=1)
     
     # Extract results from search response
     style_results = style_search.get("results", [])
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Index Store - Precompiled, memory-mapped BM25 indexes for the data directory.
+
+Compiles every CSV_CONFIG / STACK_CONFIG entry into a compact binary file
+holding the vocabulary, postings, IDF table, doc lengths and byte offsets of
+each row in the source CSV. core._search_csv maps these files instead of
+parsing and fitting the CSV when the index is newer than its source.
+
+Usage:
+    python index_store.py            # Build stale/missing indexes
+    python index_store.py --force    # Rebuild everything
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from core import (BM25, CSV_CONFIG, STACK_CONFIG, _STACK_COLS, DATA_DIR,
+                  CsvRows, _iter_documents)
+
+
+# ============ CONFIGURATION ============
+INDEX_DIR = DATA_DIR / ".index"
+INDEX_SUFFIX = ".bm25idx"
+MAGIC = b"UXBM25\x00\x01"
+
+# magic, search_cols digest, csv size, n_docs, n_terms, avgdl, k1, b
+_HEADER = struct.Struct("<8s16sQIIddd")
+# (offset, nbytes) for each section, in _SECTIONS order
+_SECTIONS = ("term_offsets", "term_blob", "idf", "post_offsets",
+             "post_docs", "post_tfs", "doc_lengths", "row_offsets")
+_TABLE = struct.Struct("<" + "QQ" * len(_SECTIONS))
+_TYPECODES = {
+    "term_offsets": "I", "idf": "d", "post_offsets": "I", "post_docs": "I",
+    "post_tfs": "I", "doc_lengths": "I", "row_offsets": "Q"
+}
+
+
+def index_path(filepath) -> Path:
+    """Location of the compiled index for a data CSV."""
+    rel = Path(filepath).relative_to(DATA_DIR)
+    return INDEX_DIR / rel.with_suffix(INDEX_SUFFIX)
+
+
+def _cols_digest(search_cols) -> bytes:
+    return hashlib.md5("\x1f".join(search_cols).encode("utf-8")).digest()
+
+
+# ============ BUILD ============
+def build_index(filepath, search_cols, out_path=None) -> Path:
+    """Compile one CSV into a binary index file."""
+    filepath = Path(filepath)
+    out_path = Path(out_path) if out_path else index_path(filepath)
+
+    row_offsets = array("Q")
+    bm25 = BM25()
+    bm25.fit(_iter_documents(filepath, search_cols, row_offsets))
+
+    terms = sorted(bm25.postings, key=lambda t: t.encode("utf-8"))
+    term_offsets, term_blob = array("I", [0]), bytearray()
+    idf, post_offsets = array("d"), array("I", [0])
+    post_docs, post_tfs = array("I"), array("I")
+    for term in terms:
+        term_blob += term.encode("utf-8")
+        term_offsets.append(len(term_blob))
+        idf.append(bm25.idf[term])
+        for idx, tf in bm25.postings[term]:
+            post_docs.append(idx)
+            post_tfs.append(tf)
+        post_offsets.append(len(post_docs))
+
+    sections = {
+        "term_offsets": term_offsets, "term_blob": bytes(term_blob), "idf": idf,
+        "post_offsets": post_offsets, "post_docs": post_docs, "post_tfs": post_tfs,
+        "doc_lengths": array("I", bm25.doc_lengths), "row_offsets": row_offsets
+    }
+
+    body, table = bytearray(), []
+    base = _HEADER.size + _TABLE.size
+    for name in _SECTIONS:
+        data = sections[name]
+        if isinstance(data, array):
+            if sys.byteorder != "little":
+                data = array(data.typecode, data)
+                data.byteswap()
+            data = data.tobytes()
+        body += b"\x00" * (-(base + len(body)) % 8)  # 8-byte align each section
+        table += [base + len(body), len(data)]
+        body += data
+
+    header = _HEADER.pack(MAGIC, _cols_digest(search_cols), filepath.stat().st_size,
+                          bm25.N, len(terms), bm25.avgdl, bm25.k1, bm25.b)
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = out_path.with_name(out_path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(_TABLE.pack(*table))
+        f.write(body)
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+def _targets():
+    """Yield (csv path, search_cols) for every configured data file."""
+    for config in CSV_CONFIG.values():
+        yield DATA_DIR / config["file"], config["search_cols"]
+    for config in STACK_CONFIG.values():
+        yield DATA_DIR / config["file"], _STACK_COLS["search_cols"]
+
+
+def build_all(force: bool = False) -> list:
+    """Compile every configured CSV; skip fresh indexes unless forced."""
+    built = []
+    for filepath, search_cols in _targets():
+        if not filepath.exists():
+            continue
+        if not force and _is_fresh(filepath, index_path(filepath)):
+            continue
+        built.append(build_index(filepath, search_cols))
+    return built
+
+
+# ============ LOAD ============
+def _is_fresh(filepath, idx_path) -> bool:
+    try:
+        return idx_path.stat().st_mtime_ns >= filepath.stat().st_mtime_ns
+    except OSError:
+        return False
+
+
+class MappedBM25(BM25):
+    """BM25 scorer backed by a memory-mapped compiled index."""
+
+    def __init__(self, mm, header, table):
+        _, _, _, n_docs, n_terms, avgdl, k1, b = header
+        super().__init__(k1, b)
+        self._mm = mm
+        view = memoryview(mm)
+        s = {}
+        for i, name in enumerate(_SECTIONS):
+            start, nbytes = table[2 * i], table[2 * i + 1]
+            s[name] = view[start:start + nbytes]
+            if name in _TYPECODES:
+                s[name] = s[name].cast(_TYPECODES[name])
+        self.N = n_docs
+        self.avgdl = avgdl
+        self.n_terms = n_terms
+        self.doc_lengths = s["doc_lengths"]
+        self.row_offsets = s["row_offsets"]
+        self._sections = s
+
+    def _term_id(self, token):
+        """Binary search the sorted vocabulary; -1 if absent."""
+        key = token.encode("utf-8")
+        offsets, blob = self._sections["term_offsets"], self._sections["term_blob"]
+        lo, hi = 0, self.n_terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            term = bytes(blob[offsets[mid]:offsets[mid + 1]])
+            if term == key:
+                return mid
+            if term < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return -1
+
+    def _postings_for(self, token):
+        tid = self._term_id(token)
+        if tid < 0:
+            return 0.0, ()
+        s = self._sections
+        start, end = s["post_offsets"][tid], s["post_offsets"][tid + 1]
+        return s["idf"][tid], zip(s["post_docs"][start:end], s["post_tfs"][start:end])
+
+
+def load_index(filepath, search_cols):
+    """Map the compiled index for a CSV.
+
+    Returns (rows, MappedBM25), or None when the index is missing, older
+    than the CSV, or was built for different search columns.
+    """
+    filepath = Path(filepath)
+    try:
+        idx_path = index_path(filepath)
+    except ValueError:  # CSV outside DATA_DIR
+        return None
+    if sys.byteorder != "little" or not _is_fresh(filepath, idx_path):
+        return None
+
+    with open(idx_path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return None
+    if len(mm) < _HEADER.size + _TABLE.size:
+        return None
+    header = _HEADER.unpack_from(mm, 0)
+    if (header[0] != MAGIC or header[1] != _cols_digest(search_cols)
+            or header[2] != filepath.stat().st_size):
+        return None
+
+    bm25 = MappedBM25(mm, header, _TABLE.unpack_from(mm, _HEADER.size))
+    return CsvRows(filepath, bm25.row_offsets), bm25
+
+
+# ============ CLI SUPPORT ============
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compile BM25 indexes for the data directory")
+    parser.add_argument("--force", action="store_true", help="Rebuild indexes even if up to date")
+
+    args = parser.parse_args()
+
+    for path in build_all(args.force):
+        print(f"Built {path.relative_to(DATA_DIR)}")
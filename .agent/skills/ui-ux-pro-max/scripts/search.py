@@ -3,20 +3,53 @@
 """
 UI/UX Pro Max Search - BM25 search engine for UI/UX style guides
 Usage: python search.py "<query>" [--domain <domain>] [--stack <stack>] [--max-results 3]
+       python search.py "<query>" --all [--include-stacks]
+       python search.py "<query>" --stacks all   (or --stacks react nextjs flutter)
        python search.py "<query>" --design-system [-p "Project Name"]
        python search.py "<query>" --design-system --persist [-p "Project Name"] [--page "dashboard"]
+       python search.py --serve [--socket PATH]
+       python search.py --batch queries.jsonl     (or --batch - for stdin)
+       python search.py --bulk manifest.json [-o apps/]
 
 Domains: style, prompt, color, chart, landing, product, ux, typography
 Stacks: html-tailwind, react, nextjs
 
+Federated search (one merged ranking):
+  --all             Search every domain at once; scores are normalized per source
+  --include-stacks  Also search every stack (with --all)
+
+Stack comparison (one index over every stack):
+  --stacks          Top --max-results guidelines per stack for the listed stacks, or all
+
 Persistence (Master + Overrides pattern):
   --persist    Save design system to design-system/MASTER.md
   --page       Also create a page-specific override file in design-system/pages/
+
+Precompiled indexes (faster cold start):
+  python index_store.py [--force]   Compile data/*.csv into data/.index/
+
+Daemon mode (hot indexes across invocations):
+  --serve      Keep indexes in memory and answer requests on a Unix socket
+  --socket     Socket path (default: $UI_PRO_MAX_SOCKET, else $XDG_RUNTIME_DIR or a 0700 per-user temp dir)
+  Regular invocations use a running daemon automatically, else run in-process.
+
+Result cache (repeated queries answer from memory):
+  UI_PRO_MAX_RESULT_CACHE=PATH   Also keep recent answers in PATH across invocations
+
+Batch mode (one process, one index pass per file):
+  --batch      JSONL of {"query", "domain" | "stack", "max_results"} records;
+               results are streamed back as JSONL in input order
+  --bulk       JSON manifest of projects and pages; writes every MASTER.md and
+               pages/*.md in one pass:
+               {"projects": [{"name": "My App", "query": "SaaS dashboard",
+                              "pages": ["settings", {"name": "dashboard", "query": "analytics"}]}]}
 """
 
 import argparse
-from core import CSV_CONFIG, AVAILABLE_STACKS, MAX_RESULTS, search, search_stack
-from design_system import generate_design_system, persist_design_system
+import json
+import sys
+from search_config import CSV_CONFIG, AVAILABLE_STACKS, MAX_RESULTS
+from search_server import call, serve
 
 
 def format_output(result):
@@ -25,13 +58,26 @@ def format_output(result):
         return f"Error: {result['error']}"
 
     output = []
-    if result.get("stack"):
+    if "stacks" in result:
+        output.append(f"## UI Pro Max Stack Comparison")
+        output.append(f"**Query:** {result['query']} | **Stacks:** {len(result['stacks'])} | **Found:** {result['count']} results\n")
+        for stack, rows in result['results'].items():
+            output.append(f"### {stack} ({len(rows)})")
+            for row in rows:
+                output.append(f"- **{row.get('Guideline', '')}** ({row.get('Category', '')}): {str(row.get('Do', ''))[:300]}")
+            output.append("")
+        return "\n".join(output)
+    if "sources" in result:
+        output.append(f"## UI Pro Max Federated Results")
+        output.append(f"**Query:** {result['query']} | **Sources:** {len(result['sources'])} | **Found:** {result['count']} results\n")
+    elif result.get("stack"):
         output.append(f"## UI Pro Max Stack Guidelines")
         output.append(f"**Stack:** {result['stack']} | **Query:** {result['query']}")
     else:
         output.append(f"## UI Pro Max Search Results")
         output.append(f"**Domain:** {result['domain']} | **Query:** {result['query']}")
-    output.append(f"**Source:** {result['file']} | **Found:** {result['count']} results\n")
+    if "file" in result:
+        output.append(f"**Source:** {result['file']} | **Found:** {result['count']} results\n")
 
     for i, row in enumerate(result['results'], 1):
         output.append(f"### Result {i}")
@@ -45,13 +91,27 @@ def format_output(result):
     return "\n".join(output)
 
 
+def read_batch(stream):
+    """Parse JSONL batch requests; malformed lines become error records"""
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            yield {"error": f"Invalid JSON: {e}"}
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="UI Pro Max Search")
-    parser.add_argument("query", help="Search query")
+    parser.add_argument("query", nargs="?", help="Search query")
     parser.add_argument("--domain", "-d", choices=list(CSV_CONFIG.keys()), help="Search domain")
     parser.add_argument("--stack", "-s", choices=AVAILABLE_STACKS, help="Stack-specific search (html-tailwind, react, nextjs)")
     parser.add_argument("--max-results", "-n", type=int, default=MAX_RESULTS, help="Max results (default: 3)")
     parser.add_argument("--json", action="store_true", help="Output as JSON")
+    parser.add_argument("--all", "-a", action="store_true", help="Search every domain and merge the results into one ranking")
+    parser.add_argument("--include-stacks", action="store_true", help="With --all, also search every stack")
+    parser.add_argument("--stacks", nargs="+", choices=AVAILABLE_STACKS + ["all"], metavar="STACK", help="Compare guidelines across stacks ('all' or stack names), top --max-results per stack")
     # Design system generation
     parser.add_argument("--design-system", "-ds", action="store_true", help="Generate complete design system recommendation")
     parser.add_argument("--project-name", "-p", type=str, default=None, help="Project name for design system output")
@@ -60,19 +120,51 @@ if __name__ == "__main__":
     parser.add_argument("--persist", action="store_true", help="Save design system to design-system/MASTER.md (creates hierarchical structure)")
     parser.add_argument("--page", type=str, default=None, help="Create page-specific override file in design-system/pages/")
     parser.add_argument("--output-dir", "-o", type=str, default=None, help="Output directory for persisted files (default: current directory)")
+    # Daemon mode
+    parser.add_argument("--serve", action="store_true", help="Run as a long-lived search daemon on a Unix socket")
+    parser.add_argument("--socket", type=str, default=None, help="Daemon socket path")
+    # Batch mode
+    parser.add_argument("--batch", type=str, default=None, metavar="FILE", help="Run JSONL batch queries from FILE ('-' for stdin)")
+    parser.add_argument("--bulk", type=str, default=None, metavar="MANIFEST", help="Generate and persist design systems for every project/page in a JSON manifest")
 
     args = parser.parse_args()
 
+    if args.serve:
+        serve(args.socket)
+        parser.exit()
+    if args.batch:
+        from core import search_batch
+        stream = sys.stdin if args.batch == "-" else open(args.batch, 'r', encoding='utf-8')
+        with stream:
+            for result in search_batch(read_batch(stream)):
+                print(json.dumps(result, ensure_ascii=False))
+        parser.exit()
+    if args.bulk:
+        from design_system import generate_design_systems_bulk
+        with open(args.bulk, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        try:
+            results = generate_design_systems_bulk(manifest, args.output_dir)
+        except ValueError as e:  # invalid manifest: nothing has been written
+            parser.error(f"--bulk {args.bulk}: {e}")
+        for result in results:
+            print(f"✅ {result['design_system_dir']}")
+            for path in result["created_files"]:
+                print(f"   📄 {path}")
+        parser.exit()
+    if args.query is None:
+        parser.error("the following arguments are required: query")
+
     # Design system takes priority
     if args.design_system:
-        result = generate_design_system(
-            args.query, 
-            args.project_name, 
-            args.format,
-            persist=args.persist,
-            page=args.page,
-            output_dir=args.output_dir
-        )
+        result = call("generate_design_system", {
+            "query": args.query,
+            "project_name": args.project_name,
+            "output_format": args.format,
+            "persist": args.persist,
+            "page": args.page,
+            "output_dir": args.output_dir
+        }, args.socket)
         print(result)
         
         # Print persistence confirmation
@@ -88,19 +180,32 @@ if __name__ == "__main__":
             print(f"📖 Usage: When building a page, check design-system/{project_slug}/pages/[page].md first.")
             print(f"   If exists, its rules override MASTER.md. Otherwise, use MASTER.md.")
             print("=" * 60)
+    # Stack comparison
+    elif args.stacks:
+        stacks = "all" if "all" in args.stacks else args.stacks
+        result = call("search_stacks", {"query": args.query, "stacks": stacks, "max_results": args.max_results}, args.socket)
+        if args.json:
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+        else:
+            print(format_output(result))
+    # Federated search
+    elif args.all:
+        result = call("search_all", {"query": args.query, "max_results": args.max_results, "stacks": args.include_stacks}, args.socket)
+        if args.json:
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+        else:
+            print(format_output(result))
     # Stack search
     elif args.stack:
-        result = search_stack(args.query, args.stack, args.max_results)
+        result = call("search_stack", {"query": args.query, "stack": args.stack, "max_results": args.max_results}, args.socket)
         if args.json:
-            import json
             print(json.dumps(result, indent=2, ensure_ascii=False))
         else:
             print(format_output(result))
     # Domain search
     else:
-        result = search(args.query, args.domain, args.max_results)
+        result = call("search", {"query": args.query, "domain": args.domain, "max_results": args.max_results}, args.socket)
         if args.json:
-            import json
             print(json.dumps(result, indent=2, ensure_ascii=False))
         else:
             print(format_output(result))
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Search Server - Long-lived search daemon over a Unix domain socket.
+
+Keeps core's fitted indexes and the design system reasoning table hot in
+memory. Requests and responses are JSON lines:
+
+    -> {"op": "search", "params": {"query": "glassmorphism", "domain": "style"}}
+    <- {"ok": true, "result": {...}}
+
+Ops: ping, search, search_stack, search_stacks, search_all, generate_design_system.
+
+Usage:
+    python search.py --serve [--socket PATH]       # Start the daemon
+    from search_server import call
+    call("search", {"query": "fintech"})            # Falls back in-process
+"""
+
+import json
+import os
+import signal
+import socket
+import socketserver
+import stat
+
+
+# ============ CONFIGURATION ============
+SOCKET_ENV = "UI_PRO_MAX_SOCKET"
+CONNECT_TIMEOUT = 0.05  # seconds; a missing daemon must not slow the CLI down
+REQUEST_TIMEOUT = 5.0  # seconds without a reply before a stalled daemon is given up on
+
+
+def default_socket_path() -> str:
+    """Socket path from $UI_PRO_MAX_SOCKET, else a private per-user location.
+
+    $XDG_RUNTIME_DIR is already private to the user; otherwise the socket
+    lives in a 0700 directory of our own under the temp directory.
+    """
+    if os.environ.get(SOCKET_ENV):
+        return os.environ[SOCKET_ENV]
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, "ui-ux-pro-max.sock")
+    import tempfile
+    uid = os.getuid() if hasattr(os, "getuid") else "user"
+    return os.path.join(tempfile.gettempdir(), f"ui-ux-pro-max-{uid}", "search.sock")
+
+
+def _owned_by_us(st) -> bool:
+    return not hasattr(os, "getuid") or st.st_uid == os.getuid()
+
+
+def _ensure_private_dir(path: str):
+    """Create the default socket's directory as 0700; refuse one we do not own."""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or not _owned_by_us(st):
+        raise RuntimeError(f"{path} is not a directory owned by this user")
+    if st.st_mode & 0o077:
+        os.chmod(path, 0o700)
+
+
+# ============ DISPATCH ============
+_generator = None
+
+
+def _get_generator():
+    """Shared DesignSystemGenerator so reasoning rules are loaded once."""
+    global _generator
+    if _generator is None:
+        from design_system import DesignSystemGenerator
+        _generator = DesignSystemGenerator()
+    return _generator
+
+
+def dispatch(op: str, params: dict):
+    """Execute one request in-process and return its result."""
+    if op == "ping":
+        return "pong"
+    if op == "search":
+        from core import search
+        return search(**params)
+    if op == "search_stack":
+        from core import search_stack
+        return search_stack(**params)
+    if op == "search_stacks":
+        from core import search_stacks
+        return search_stacks(**params)
+    if op == "search_all":
+        from core import search_all
+        return search_all(**params)
+    if op == "generate_design_system":
+        from design_system import generate_design_system
+        return generate_design_system(**params, generator=_get_generator())
+    raise ValueError(f"Unknown op: {op}")
+
+
+# ============ SERVER ============
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                result = dispatch(request["op"], request.get("params") or {})
+                response = {"ok": True, "result": result}
+            except Exception as e:  # report to the client, keep serving
+                response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(socket_path: str = None):
+    """Run the daemon until interrupted."""
+    if not socket_path:
+        socket_path = default_socket_path()
+        if not os.environ.get(SOCKET_ENV):
+            _ensure_private_dir(os.path.dirname(socket_path))
+    if os.path.exists(socket_path):
+        live = _connect(socket_path)
+        if live is not None:
+            live.close()
+            raise RuntimeError(f"A search daemon is already listening on {socket_path}")
+        os.unlink(socket_path)  # stale socket from a dead daemon
+
+    # Warm the reasoning table; indexes warm on first use per file
+    _get_generator()
+
+    def _terminate(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, _terminate)
+
+    with _Server(socket_path, _Handler) as server:
+        print(f"UI Pro Max search daemon listening on {socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(socket_path)
+
+
+# ============ CLIENT ============
+def _connect(socket_path: str):
+    """Connect to a daemon socket owned by this user; None otherwise."""
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    try:
+        st = os.stat(socket_path)
+    except OSError:
+        return None
+    if not stat.S_ISSOCK(st.st_mode) or not _owned_by_us(st):
+        return None  # another user's socket would see (and answer) our queries
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        return None
+    sock.settimeout(REQUEST_TIMEOUT)
+    return sock
+
+
+def call(op: str, params: dict = None, socket_path: str = None):
+    """Run a request on the daemon, or in-process if none is running."""
+    params = dict(params or {})
+    if op == "generate_design_system" and params.get("persist") and not params.get("output_dir"):
+        params["output_dir"] = os.getcwd()  # the daemon's cwd is not ours
+
+    sock = _connect(socket_path or default_socket_path())
+    if sock is None:
+        return dispatch(op, params)
+
+    try:
+        with sock, sock.makefile("rwb") as stream:
+            stream.write(json.dumps({"op": op, "params": params}, ensure_ascii=False).encode("utf-8") + b"\n")
+            stream.flush()
+            line = stream.readline()
+    except OSError:  # timed out or reset: a stalled daemon must not hang the CLI
+        line = b""
+    if not line:
+        return dispatch(op, params)  # daemon went away or stalled mid-request
+
+    response = json.loads(line)
+    if not response.get("ok"):
+        raise RuntimeError(response.get("error", "Search daemon error"))
+    return response["result"]
@@ -0,0 +1,112 @@
+import os
+from array import array
+
+import pytest
+
+import index_store
+from core import BM25, CsvRows, _build_index, _iter_documents
+from index_store import MappedBM25, build_index, index_path, load_index
+
+COLS = ["Name", "Keywords"]
+QUERIES = ["minimal dark", "glass blur", "brutalism", "café", "nothing matches this", "dark dark mode"]
+ROWS = [
+    ("Minimalism", "clean, white space, minimal"),
+    ("Dark Mode", "dark, low light, oled"),
+    ("Glassmorphism", "frosted glass, blur, translucent"),
+    ("Brutalism", "raw, bold, \"unpolished\""),
+    ("Café Menu", "warm, serif, café"),
+    ("Neo Dark Glass", "dark glass, neon"),
+]
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(index_store, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(index_store, "INDEX_DIR", tmp_path / ".index")
+    return tmp_path
+
+
+def write_csv(path, rows=ROWS):
+    lines = ["Name,Keywords,Notes"]
+    for name, keywords in rows:
+        lines.append(f'{name},"{keywords.replace(chr(34), chr(34) * 2)}",x')
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+def shift_mtime(path, seconds):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 1_000_000_000))
+
+
+def in_memory(filepath):
+    offsets = array("Q")
+    bm25 = BM25()
+    bm25.fit(_iter_documents(filepath, COLS, offsets))
+    return CsvRows(filepath, offsets), bm25
+
+
+def test_mapped_scores_match_in_memory(data_dir):
+    filepath = write_csv(data_dir / "styles.csv")
+    build_index(filepath, COLS)
+    rows, mapped = load_index(filepath, COLS)
+    expected_rows, bm25 = in_memory(filepath)
+
+    assert isinstance(mapped, MappedBM25)
+    assert mapped.N == bm25.N == len(ROWS)
+    assert list(mapped.doc_lengths) == bm25.doc_lengths
+    assert [rows[i] for i in range(len(ROWS))] == [expected_rows[i] for i in range(len(ROWS))]
+    for query in QUERIES:
+        assert mapped.score(query) == bm25.score(query)
+        assert mapped.score(query, top_k=2) == bm25.score(query, top_k=2)
+        assert mapped.max_score(query) == bm25.max_score(query)
+
+
+def test_index_path_mirrors_data_dir(data_dir):
+    (data_dir / "stacks").mkdir()
+    filepath = write_csv(data_dir / "stacks" / "react.csv")
+    assert build_index(filepath, COLS) == data_dir / ".index" / "stacks" / "react.bm25idx"
+    assert load_index(filepath, COLS) is not None
+    assert load_index(data_dir.parent / "elsewhere.csv", COLS) is None
+
+
+def test_csv_newer_than_index_falls_back(data_dir):
+    filepath = write_csv(data_dir / "styles.csv")
+    build_index(filepath, COLS)
+    shift_mtime(filepath, 10)
+
+    assert load_index(filepath, COLS) is None
+    rows, bm25 = _build_index(filepath, COLS)
+    assert not isinstance(bm25, MappedBM25)
+    assert bm25.score("glass") == in_memory(filepath)[1].score("glass")
+
+
+def test_size_mismatch_is_stale(data_dir):
+    filepath = write_csv(data_dir / "styles.csv")
+    build_index(filepath, COLS)
+    write_csv(filepath, ROWS + [("Glass Cards", "glass, cards")])
+    shift_mtime(index_path(filepath), 10)  # index still looks newer than the CSV
+
+    assert load_index(filepath, COLS) is None
+    _, bm25 = _build_index(filepath, COLS)
+    assert bm25.N == len(ROWS) + 1
+
+
+def test_cols_digest_mismatch_is_stale(data_dir):
+    filepath = write_csv(data_dir / "styles.csv")
+    build_index(filepath, COLS)
+
+    assert load_index(filepath, ["Name"]) is None
+    assert load_index(filepath, list(reversed(COLS))) is None
+    assert load_index(filepath, COLS) is not None
+
+
+@pytest.mark.parametrize("content", [b"", b"UXBM25", b"NOTANIDX" + b"\x00" * 400])
+def test_missing_or_corrupt_index_is_ignored(data_dir, content):
+    filepath = write_csv(data_dir / "styles.csv")
+    assert load_index(filepath, COLS) is None
+    idx_path = index_path(filepath)
+    idx_path.parent.mkdir(parents=True)
+    idx_path.write_bytes(content)
+    shift_mtime(idx_path, 10)
+    assert load_index(filepath, COLS) is None
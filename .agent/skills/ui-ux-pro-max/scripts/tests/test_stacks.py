@@ -0,0 +1,60 @@
+import heapq
+
+import pytest
+
+from core import AVAILABLE_STACKS, FacetedIndex, _get_stacks_index, _rank_key, search_stacks
+
+QUERIES = ["state management", "image optimization lazy loading", "accessibility", "form validation error"]
+COLS = ["Guideline", "Description"]
+
+
+def filtered(index, query, stack, top_k):
+    """Plain search over the whole index, then keep one stack's documents."""
+    facet = index.facet_ids[stack]
+    start, stop = index.starts[facet], index.starts[facet] + len(index.rows[facet])
+    hits = [(doc, score) for doc, score in index.bm25.score(query) if start <= doc < stop]
+    return heapq.nsmallest(top_k, hits, key=_rank_key)
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_search_stacks_matches_search_plus_filter(query):
+    index = _get_stacks_index()
+    stacks = ["react", "vue", "flutter"]
+    result = search_stacks(query, stacks, max_results=5)
+    assert result["stacks"] == stacks
+    for stack in stacks:
+        expected = [{"score": round(score, 4), "Guideline": index.row(doc)["Guideline"]}
+                    for doc, score in filtered(index, query, stack, 5)]
+        got = [{"score": row["score"], "Guideline": row["Guideline"]} for row in result["results"][stack]]
+        assert got == expected
+
+
+def test_faceted_score_matches_unrestricted_pass():
+    index = _get_stacks_index()
+    for query in QUERIES:
+        everything = index.score(query)
+        assert everything.keys() == set(AVAILABLE_STACKS) & index.facet_ids.keys()
+        subset = ["nextjs", "html-tailwind", "jetpack-compose"]  # out of file order
+        assert index.score(query, facets=subset) == {stack: everything[stack] for stack in subset}
+
+
+def write_csv(path, rows):
+    path.write_text("Guideline,Description\n" + "".join(f"{g},{d}\n" for g, d in rows), encoding="utf-8")
+    return path
+
+
+def test_faceted_index_edges(tmp_path):
+    sources = [
+        ("a", write_csv(tmp_path / "a.csv", [("cache", "keep it warm"), ("cache", "cache misses")])),
+        ("empty", write_csv(tmp_path / "empty.csv", [])),
+        ("b", write_csv(tmp_path / "b.csv", [("render", "cache layout"), ("paint", "avoid reflow")])),
+    ]
+    index = FacetedIndex.build(sources, COLS)
+    assert index.starts == [0, 2, 2]
+
+    ranked = index.score("cache", facets=["b", "empty"])
+    assert list(ranked) == ["b", "empty"]
+    assert ranked["empty"] == []
+    assert [doc for doc, _ in ranked["b"]] == [2]
+    assert ranked["b"] == index.score("cache")["b"]
+    assert [doc for doc, _ in index.score("cache", top_k=1, facets=["a"])["a"]] == [1]
@@ -1,53 +1,215 @@
+"""
+Validate curriculum (CTDT) CSVs for section/English-subtitle conflicts.
 
-import os
+Walks a directory tree, checks every CSV on a process pool and prints one
+merged report ordered by file path. Results are cached in a manifest next to
+the corpus (path -> size, mtime, content hash, findings) so a rerun only
+re-validates new or changed files.
+
+Usage:
+    python check_logic_conflict.py [DIRECTORY] [--workers N] [--full] [--pack [FILE]]
+
+DIRECTORY defaults to public/CTDT/Organized_CTDT. With --pack the files are
+read from a corpus pack (see ctdt_pack.py) instead of the directory tree.
+"""
+
+import argparse
 import csv
-import re
-
-directory = r"c:\Users\LG\Desktop\Study Material\AI\TKBSV\public\CTDT\Organized_CTDT\CHƯƠNG TRÌNH TIÊN TIẾN\Hệ thống Năng lượng"
-vietnamese_pattern = re.compile(r'[àáạảãâầấậẩẫăằắặẳẵèéẹẻẽêềếệểễìíịỉĩòóọỏõôồốộổỗơờớợởỡùúụủũưừứựửữỳýỵỷỹđ]', re.IGNORECASE)
-
-def check_logic():
-    files = [f for f in os.listdir(directory) if f.endswith('.csv')]
-    
-    for file_name in files:
-        print(f"\n--- Checking: {file_name} ---")
-        file_path = os.path.join(directory, file_name)
-        
-        with open(file_path, 'r', encoding='utf-8-sig') as f:
-            reader = csv.reader(f)
-            next(reader) # Skip header
-            
-            for i, row in enumerate(reader, start=2):
-                if len(row) < 6: continue
-                stt, ma_hp, ten_hp, tin_chi = row[0], row[1], row[2], row[3]
-                
-                # Logic simulation
-                is_stt_empty = not stt.strip()
-                is_code_empty = not ma_hp.strip()
-                has_vietnamese = bool(vietnamese_pattern.search(ten_hp))
-                has_credits = bool(tin_chi.strip())
-                starts_with_capital = re.match(r'^[A-Z]', ten_hp) is not None
-                
-                # Identify conflict
-                is_potential_section = is_stt_empty and is_code_empty
-                
-                if is_potential_section:
-                    # Current JS Logic simulation
-                    js_is_english = starts_with_capital
-                    
-                    # Proposed Logic
-                    proposed_is_section = has_vietnamese or has_credits
-                    proposed_is_english = not proposed_is_section
-                    
-                    status = ""
-                    if js_is_english and proposed_is_section:
-                        status = "CONFLICT (JS thinks English, Proposed thinks Section)"
-                    elif not js_is_english and not proposed_is_section:
-                        status = "UNKNOWN"
-                    else:
-                        status = "MATCH"
-                        
-                    if status.startswith("CONFLICT"):
-                        print(f"Line {i}: {ten_hp} | Credits: '{tin_chi}' | HasVN: {has_vietnamese} -> {status}")
-
-check_logic()
+import hashlib
+import io
+import json
+from pathlib import Path
+from ctdt_common import DEFAULT_DIRECTORY, iter_csv_files, process_map, write_json
+from ctdt_rows import SECTION, classify_row, has_vietnamese, starts_with_capital
+
+MANIFEST_NAME = ".ctdt_manifest.json"
+VALIDATOR_VERSION = 1 # Bump when check logic changes so cached findings are dropped
+
+
+def check_file(file_path):
+    """Return the conflicts found in one CSV as a list of dicts."""
+    with open(file_path, 'r', encoding='utf-8-sig') as f:
+        return check_rows(csv.reader(f))
+
+
+def check_rows(reader):
+    """Return the conflicts found in the rows of one CSV reader."""
+    conflicts = []
+    next(reader, None) # Skip header
+
+    for i, row in enumerate(reader, start=2):
+        if len(row) < 6: continue
+
+        # The frontend treats a capitalized name in an STT/code-less row as an
+        # English subtitle; the proposed logic calls it a section when it has
+        # Vietnamese text or credits.
+        if classify_row(row) == SECTION and starts_with_capital(row[2]):
+            conflicts.append({
+                "line": i,
+                "name": row[2],
+                "credits": row[3],
+                "has_vietnamese": has_vietnamese(row[2]),
+                "status": "CONFLICT (JS thinks English, Proposed thinks Section)"
+            })
+
+    return conflicts
+
+
+def _check_data(data, cached_digest):
+    """Hash and check raw CSV bytes. Returns (sha256, conflicts, error).
+
+    conflicts is None when the content hash equals the cached one.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    if digest == cached_digest:
+        return digest, None, None
+    try:
+        text = io.StringIO(str(data, 'utf-8-sig'), newline=None)
+        return digest, check_rows(csv.reader(text)), None
+    except (UnicodeDecodeError, csv.Error) as e:
+        return digest, [], f"{type(e).__name__}: {e}"
+
+
+def _check_one(job):
+    """Worker: read one file and check it."""
+    file_path, cached_digest = job
+    try:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+    except OSError as e:
+        return None, [], f"{type(e).__name__}: {e}"
+    return _check_data(data, cached_digest)
+
+
+_worker_packs = {}
+
+
+def _check_packed(job):
+    """Worker: check one file as a zero-copy slice of the mapped pack."""
+    pack_path, rel_path, cached_digest = job
+    pack = _worker_packs.get(pack_path)
+    if pack is None:
+        from ctdt_pack import CorpusPack
+        pack = _worker_packs[pack_path] = CorpusPack(pack_path)
+    with pack.view(rel_path) as data:
+        return _check_data(data, cached_digest)
+
+
+def load_manifest(manifest_path):
+    """Cached entries keyed by relative path; empty if missing or stale."""
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != VALIDATOR_VERSION:
+        return {}
+    return manifest.get("files", {})
+
+
+def save_manifest(manifest_path, entries):
+    write_json(manifest_path, {"version": VALIDATOR_VERSION, "files": entries}, compact=False)
+
+
+def _iter_stats(directory, pack_path=None):
+    """Yield (relative path, path, size, mtime_ns) from the tree or a pack's index."""
+    if pack_path:
+        from ctdt_pack import CorpusPack
+        with CorpusPack(pack_path) as pack:
+            for rel_path in pack.paths():
+                yield (rel_path, rel_path, *pack.stat(rel_path))
+        return
+    for path in iter_csv_files(directory):
+        stat = path.stat()
+        yield path.relative_to(directory).as_posix(), path, stat.st_size, stat.st_mtime_ns
+
+
+def validate_tree(directory, workers=None, full=False, manifest_path=None, pack_path=None):
+    """Check every new or changed CSV under directory in parallel.
+
+    Files whose size and mtime match the manifest reuse their cached
+    findings without being read, and touched files whose content hash is
+    unchanged reuse them after hashing; full=True ignores the manifest.
+    With pack_path, files are read from the corpus pack through one shared
+    mapping instead of per-file opens; files added, removed or touched
+    since the pack was written are updated in it first.
+    Returns ([(relative_path, conflicts, error)] ordered by path, number
+    of files re-validated).
+    """
+    directory = Path(directory)
+    manifest_path = manifest_path or directory / MANIFEST_NAME
+    cached = {} if full else load_manifest(manifest_path)
+    if pack_path:
+        from ctdt_pack import update_pack
+        update_pack(directory, pack_path) # stale bytes would be validated and cached
+
+    entries, pending = {}, []
+    for rel_path, path, size, mtime_ns in _iter_stats(directory, pack_path):
+        entry = cached.get(rel_path)
+        if (entry and entry.get("sha256") is not None # read failures are always re-checked
+                and entry["size"] == size and entry["mtime_ns"] == mtime_ns):
+            entries[rel_path] = entry
+        else:
+            entries[rel_path] = {"size": size, "mtime_ns": mtime_ns}
+            pending.append((rel_path, path, entry))
+
+    revalidated = 0
+    if pending:
+        if pack_path:
+            worker = _check_packed
+            jobs = [(str(pack_path), rel_path, entry and entry.get("sha256")) for rel_path, _, entry in pending]
+        else:
+            worker = _check_one
+            jobs = [(path, entry and entry.get("sha256")) for _, path, entry in pending]
+        for (rel_path, _, entry), (digest, conflicts, error) in zip(pending, process_map(worker, jobs, workers)):
+            if conflicts is None: # touched but unchanged
+                conflicts, error = entry["conflicts"], entry["error"]
+            else:
+                revalidated += 1
+            entries[rel_path].update(sha256=digest, conflicts=conflicts, error=error)
+
+    # A file that could not be read has no hash; leave it out so the next run retries it
+    save_manifest(manifest_path, {rel_path: entry for rel_path, entry in entries.items()
+                                  if entry.get("sha256") is not None})
+
+    report = [(rel_path, entry["conflicts"], entry["error"]) for rel_path, entry in sorted(entries.items())]
+    return report, revalidated
+
+
+def format_report(report):
+    """Render a validation report as text."""
+    lines = []
+    total = 0
+    for rel_path, conflicts, error in report:
+        lines.append(f"\n--- Checking: {rel_path} ---")
+        if error:
+            lines.append(f"ERROR: {error}")
+        for c in conflicts:
+            lines.append(f"Line {c['line']}: {c['name']} | Credits: '{c['credits']}' | HasVN: {c['has_vietnamese']} -> {c['status']}")
+        total += len(conflicts)
+    lines.append(f"\n{len(report)} files checked, {total} conflicts")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check CTDT CSVs for section/English-subtitle conflicts")
+    parser.add_argument("directory", nargs="?", default=str(DEFAULT_DIRECTORY), help="Corpus root to scan recursively")
+    parser.add_argument("--workers", "-j", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--full", action="store_true", help="Ignore the manifest and re-validate every file")
+    parser.add_argument("--manifest", default=None, help=f"Manifest path (default: DIRECTORY/{MANIFEST_NAME})")
+    parser.add_argument("--pack", nargs="?", const="", default=None,
+                        help="Read files from a corpus pack, updated if stale (default: DIRECTORY's pack under .cache/ctdt)")
+    args = parser.parse_args()
+
+    pack_path = args.pack
+    if pack_path == "":
+        from ctdt_pack import default_pack_path
+        pack_path = default_pack_path(args.directory)
+
+    report, revalidated = validate_tree(args.directory, args.workers, args.full, args.manifest, pack_path)
+    print(format_report(report))
+    print(f"{revalidated} files re-validated, {len(report) - revalidated} reused from manifest")
+
+
+if __name__ == "__main__":
+    main()
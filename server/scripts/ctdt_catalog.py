@@ -0,0 +1,249 @@
+"""
+Build a deduplicated course catalog across every curriculum CSV.
+
+The same course (e.g. MT1003) appears in hundreds of programs and cohort
+years. The catalog interns each course code and name once and stores:
+
+    courses          code -> course id (code, name, English name, credits)
+    programs         program id -> metadata (faculty, major, kind, year)
+    program_courses  program id -> course ids       (CSR integer arrays)
+    course_programs  course id  -> program ids      (inverse of the above)
+
+so "which programs need CO2013" is a dict lookup plus an array slice.
+
+Programs are read from ctdt_parser's columnar artifacts (re-parsing only
+CSVs that changed since they were written).
+
+Usage:
+    python ctdt_catalog.py [DIRECTORY ...] [--out FILE] [--parsed DIR] [--workers N]
+    python ctdt_catalog.py --lookup CO2013
+"""
+
+import argparse
+import json
+import os
+import sys
+from array import array
+from collections import Counter
+from ctdt_common import CTDT_ROOT, DEFAULT_SOURCES, write_json
+from ctdt_parser import DEFAULT_OUT as DEFAULT_PARSED, load_programs
+
+DEFAULT_OUT = CTDT_ROOT / "ctdt_catalog.json"
+FORMAT_VERSION = 1
+PROGRAM_FIELDS = ("id", "faculty", "major", "kind", "year", "from_year", "source")
+
+
+def course_key(code, name):
+    """Catalog key of a parsed course: its code, or its name when it has none."""
+    return code or name
+
+
+def _most_common(counter):
+    return counter.most_common(1)[0][0] if counter else None
+
+
+class CourseCatalog:
+    """Interned course catalog with program <-> course indexes."""
+
+    def __init__(self, strings, courses, programs, program_courses, course_programs):
+        self.strings = strings
+        self.courses = courses # columns: key, code, name, name_en, credits (string ids / values)
+        self.programs = programs # columns: PROGRAM_FIELDS
+        self.program_courses = program_courses # (offsets, course ids)
+        self.course_programs = course_programs # (offsets, program ids)
+        self._course_ids = {strings[k]: i for i, k in enumerate(courses["key"])}
+        self._program_ids = {pid: i for i, pid in enumerate(programs["id"])}
+
+    def __len__(self):
+        return len(self.courses["key"])
+
+    # ---------- build ----------
+    @classmethod
+    def from_programs(cls, parsed_programs):
+        """Build from columnar programs (ctdt_parser.load_programs)."""
+        strings, string_ids = [], {}
+
+        def intern(value):
+            if value is None:
+                return -1
+            sid = string_ids.get(value)
+            if sid is None:
+                sid = string_ids[value] = len(strings)
+                strings.append(sys.intern(value))
+            return sid
+
+        course_ids = {}
+        has_code, names, names_en, credits = [], [], [], []
+        programs = {field: [] for field in PROGRAM_FIELDS}
+        pc_offsets, pc_ids = array("I", [0]), array("I")
+
+        for parsed in sorted(parsed_programs, key=lambda p: p["program"]["id"]):
+            for field in PROGRAM_FIELDS:
+                programs[field].append(parsed["program"][field])
+            seen = set()
+            columns = parsed["courses"]
+            for code, name, name_en, credit in zip(columns["code"], columns["name"],
+                                                   columns["name_en"], columns["credits"]):
+                key = course_key(code, name)
+                cid = course_ids.get(key)
+                if cid is None:
+                    cid = course_ids[key] = len(course_ids)
+                    has_code.append(bool(code))
+                    names.append(Counter())
+                    names_en.append(Counter())
+                    credits.append(Counter())
+                names[cid][name] += 1
+                if name_en:
+                    names_en[cid][name_en] += 1
+                if credit is not None:
+                    credits[cid][credit] += 1
+                if cid not in seen: # a course listed twice in one program counts once
+                    seen.add(cid)
+                    pc_ids.append(cid)
+            pc_offsets.append(len(pc_ids))
+
+        # Most frequent spelling wins when programs disagree on a name or credit count
+        keys = list(course_ids)
+        courses = {
+            "key": [intern(k) for k in keys],
+            "code": [intern(k) if has_code[i] else -1 for i, k in enumerate(keys)],
+            "name": [intern(_most_common(c)) for c in names],
+            "name_en": [intern(_most_common(c)) for c in names_en],
+            "credits": [_most_common(c) for c in credits]
+        }
+        return cls(strings, courses, programs, (pc_offsets, pc_ids),
+                   _invert(pc_offsets, pc_ids, len(keys)))
+
+    # ---------- lookups ----------
+    def course_id(self, key):
+        """Course id for a code (or code-less course name); None if unknown."""
+        return self._course_ids.get(key)
+
+    def course(self, key):
+        """Catalog entry for a course code as a dict, or None."""
+        cid = self.course_id(key)
+        if cid is None:
+            return None
+        s, c = self.strings, self.courses
+        return {
+            "id": cid,
+            "code": s[c["code"][cid]] if c["code"][cid] >= 0 else None,
+            "name": s[c["name"][cid]],
+            "name_en": s[c["name_en"][cid]] if c["name_en"][cid] >= 0 else None,
+            "credits": c["credits"][cid]
+        }
+
+    def program_indexes(self, key):
+        """Program indexes that include a course (empty if unknown)."""
+        cid = self.course_id(key)
+        if cid is None:
+            return array("I")
+        offsets, ids = self.course_programs
+        return ids[offsets[cid]:offsets[cid + 1]]
+
+    def programs_for(self, key):
+        """Program ids that include a course."""
+        return [self.programs["id"][p] for p in self.program_indexes(key)]
+
+    def years_for(self, key):
+        """Sorted cohort years whose programs include a course."""
+        years = self.programs["year"]
+        return sorted({years[p] for p in self.program_indexes(key) if years[p] is not None})
+
+    def course_indexes(self, program_id):
+        """Course ids of a program (empty if unknown)."""
+        pid = self._program_ids.get(program_id)
+        if pid is None:
+            return array("I")
+        offsets, ids = self.program_courses
+        return ids[offsets[pid]:offsets[pid + 1]]
+
+    def courses_for(self, program_id):
+        """Course keys (codes) of a program, in curriculum order."""
+        keys = self.courses["key"]
+        return [self.strings[keys[cid]] for cid in self.course_indexes(program_id)]
+
+    # ---------- serialization ----------
+    def to_dict(self):
+        return {
+            "v": FORMAT_VERSION,
+            "strings": self.strings,
+            "courses": self.courses,
+            "programs": self.programs,
+            "program_courses": [list(a) for a in self.program_courses],
+            "course_programs": [list(a) for a in self.course_programs]
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("v") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported catalog format: {data.get('v')}")
+        strings = [sys.intern(s) for s in data["strings"]]
+        return cls(strings, data["courses"], data["programs"],
+                   tuple(array("I", a) for a in data["program_courses"]),
+                   tuple(array("I", a) for a in data["course_programs"]))
+
+
+def _invert(offsets, ids, n_targets):
+    """Transpose a CSR mapping (rows -> targets) into (targets -> rows)."""
+    counts = [0] * (n_targets + 1)
+    for target in ids:
+        counts[target + 1] += 1
+    inv_offsets = array("I", counts)
+    for i in range(1, len(inv_offsets)):
+        inv_offsets[i] += inv_offsets[i - 1]
+    inv_ids = array("I", bytes(4 * len(ids)))
+    cursor = array("I", inv_offsets[:-1])
+    for row in range(len(offsets) - 1):
+        for target in ids[offsets[row]:offsets[row + 1]]:
+            inv_ids[cursor[target]] = row
+            cursor[target] += 1
+    return inv_offsets, inv_ids
+
+
+def build_catalog(directories=DEFAULT_SOURCES, workers=None, parsed_dir=DEFAULT_PARSED):
+    """Build the catalog from the parsed program artifacts under the given roots."""
+    return CourseCatalog.from_programs(load_programs(directories, parsed_dir, workers))
+
+
+def save_catalog(catalog, out_path):
+    write_json(out_path, catalog.to_dict())
+
+
+def load_catalog(path=DEFAULT_OUT):
+    with open(path, 'r', encoding='utf-8') as f:
+        return CourseCatalog.from_dict(json.load(f))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the deduplicated CTDT course catalog")
+    parser.add_argument("directories", nargs="*", default=[str(d) for d in DEFAULT_SOURCES],
+                        help="Corpus roots to scan recursively (default: Organized_CTDT and Organized_KHGD)")
+    parser.add_argument("--out", "-o", default=str(DEFAULT_OUT), help="Catalog file")
+    parser.add_argument("--parsed", default=str(DEFAULT_PARSED), help="Parsed program artifacts (see ctdt_parser.py)")
+    parser.add_argument("--workers", "-j", type=int, default=None, help="Worker processes for re-parsing (default: all cores)")
+    parser.add_argument("--lookup", metavar="CODE", help="Look up a course in an existing catalog instead of building")
+    args = parser.parse_args()
+
+    if args.lookup:
+        catalog = load_catalog(args.out)
+        course = catalog.course(args.lookup)
+        if course is None:
+            print(f"{args.lookup}: not in catalog")
+            return
+        programs = catalog.programs_for(args.lookup)
+        print(json.dumps(course, ensure_ascii=False))
+        print(f"{len(programs)} programs, years {catalog.years_for(args.lookup)}")
+        for program_id in programs:
+            print(f"  {program_id}")
+        return
+
+    catalog = build_catalog(args.directories, args.workers, args.parsed)
+    save_catalog(catalog, args.out)
+    print(f"{len(catalog.programs['id'])} programs, {len(catalog)} unique courses, "
+          f"{len(catalog.program_courses[1])} program entries -> {args.out} "
+          f"({os.path.getsize(args.out) / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Helpers shared by the curriculum (CTDT) scripts and the timetable solver.
+
+Corpus locations, CSV discovery, the process-pool fan-out every batch
+script uses, atomic file writes and bitset iteration. This module imports
+nothing from its siblings, so any of them can depend on it.
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+CTDT_ROOT = Path(__file__).resolve().parents[2] / "public" / "CTDT"
+DEFAULT_DIRECTORY = CTDT_ROOT / "Organized_CTDT"
+DEFAULT_SOURCES = (DEFAULT_DIRECTORY, CTDT_ROOT / "Organized_KHGD")
+
+
+def iter_csv_files(directory):
+    """All CSV files under directory, sorted by relative path."""
+    directory = Path(directory)
+    return sorted(p for p in directory.rglob('*.csv') if p.is_file())
+
+
+def iter_corpus(directories):
+    """Yield (path, root) for every CSV under each existing root."""
+    for root in directories:
+        root = Path(root)
+        if root.is_dir():
+            for path in iter_csv_files(root):
+                yield path, root
+
+
+def iter_bits(bits):
+    """Yield the indexes of the set bits of an int, lowest first."""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def default_workers(workers=None):
+    """workers, or every core when it is not given."""
+    return workers or os.cpu_count() or 1
+
+
+def chunk_size(n_jobs, workers):
+    """Chunk size giving each worker about four chunks."""
+    return max(1, n_jobs // (workers * 4))
+
+
+def process_map(fn, jobs, workers=None):
+    """pool.map(fn, jobs) on a process pool sized like the CLI --workers option.
+
+    Results are yielded in job order; the pool shuts down once they are
+    consumed.
+    """
+    jobs = list(jobs)
+    workers = default_workers(workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(fn, jobs, chunksize=chunk_size(len(jobs), workers))
+
+
+@contextmanager
+def atomic_open(path, mode='w'):
+    """Open a temporary sibling of path that replaces it only once written.
+
+    Readers see either the old file or the complete new one.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    encoding = None if 'b' in mode else 'utf-8'
+    try:
+        with open(tmp_path, mode, encoding=encoding) as f:
+            yield f
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    os.replace(tmp_path, path)
+
+
+def write_json(path, data, compact=True):
+    """Atomically write data as UTF-8 JSON."""
+    with atomic_open(path) as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':') if compact else None)
@@ -0,0 +1,283 @@
+"""
+Prerequisite graph engine for curriculum (CTDT) programs.
+
+Builds one requisite graph per program from the "Học phần tiên quyết/song
+hành" column: prerequisite edges (TQ, HT, KN, untagged) and co-requisite
+edges (SH, SHT). For each program it reports cycles and dangling
+references, and precomputes transitive closures as integer bitsets (bit i
+= course i of the program), so "what must I take before X" and "what does
+X unlock" are a single lookup at request time.
+
+Programs are read from ctdt_parser's columnar artifacts (re-parsing only
+CSVs that changed since they were written).
+
+Usage:
+    python ctdt_graph.py [DIRECTORY ...] [--out FILE] [--parsed DIR] [--workers N]
+    python ctdt_graph.py --program ID --course CO2013
+"""
+
+import argparse
+import json
+from ctdt_catalog import course_key
+from ctdt_common import CTDT_ROOT, DEFAULT_SOURCES, iter_bits, iter_corpus, process_map, write_json
+from ctdt_parser import DEFAULT_OUT as DEFAULT_PARSED, load_program
+
+DEFAULT_OUT = CTDT_ROOT / "ctdt_graph.json"
+FORMAT_VERSION = 1
+
+
+def strongly_connected(n, successors):
+    """Tarjan's SCCs (iterative). Returns (component of each node, components).
+
+    Components come out in reverse topological order: every edge points to a
+    component emitted no later than its source's.
+    """
+    index, low = [-1] * n, [0] * n
+    on_stack, stack = [False] * n, []
+    component = [-1] * n
+    components = []
+    counter = 0
+
+    for root in range(n):
+        if index[root] >= 0:
+            continue
+        work = [(root, iter(successors[root]))]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if index[child] < 0:
+                    index[child] = low[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack[child] = True
+                    work.append((child, iter(successors[child])))
+                    break
+                if on_stack[child]:
+                    low[node] = min(low[node], index[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    members = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component[member] = len(components)
+                        members.append(member)
+                        if member == node:
+                            break
+                    components.append(members)
+    return component, components
+
+
+def _closure(successors, component, components):
+    """Bitset of everything reachable from each node (itself excluded unless cyclic)."""
+    reach = [0] * len(components)
+    for c, members in enumerate(components): # successors' components are already done
+        bits = 0
+        for node in members:
+            for child in successors[node]:
+                bits |= reach[component[child]] | (1 << child)
+        reach[c] = bits
+    return [reach[component[node]] for node in range(len(successors))]
+
+
+class PrerequisiteGraph:
+    """Requisite graph of one program with precomputed closure bitsets."""
+
+    def __init__(self, program_id, codes, n_internal, before, unlocks, corequisites,
+                 cycles=(), dangling=()):
+        self.program_id = program_id
+        self.codes = codes # node -> course key; nodes >= n_internal are referenced but not listed
+        self.n_internal = n_internal
+        self.before = before # node -> bitset of all transitive prerequisites
+        self.unlocks = unlocks # node -> bitset of all courses it transitively unlocks
+        self.corequisites = corequisites # node -> bitset of direct co-requisites
+        self.cycles = [list(c) for c in cycles]
+        self.dangling = [tuple(d) for d in dangling]
+        self._nodes = {code: i for i, code in enumerate(codes)}
+
+    @classmethod
+    def from_program(cls, parsed):
+        """Build from a columnar program (ctdt_parser.load_program)."""
+        codes, nodes = [], {}
+
+        def node_of(code):
+            node = nodes.get(code)
+            if node is None:
+                node = nodes[code] = len(codes)
+                codes.append(code)
+            return node
+
+        columns = parsed["courses"]
+        for code, name in zip(columns["code"], columns["name"]):
+            node_of(course_key(code, name))
+        n_internal = len(codes)
+
+        requires = [[] for _ in range(n_internal)]
+        coreq_edges = []
+        dangling = set()
+        pre_offsets, pre_codes = columns["pre_offsets"], columns["pre_codes"]
+        co_offsets, co_codes = columns["co_offsets"], columns["co_codes"]
+        for i, (code, name) in enumerate(zip(columns["code"], columns["name"])):
+            node = nodes[course_key(code, name)]
+            for prerequisite in pre_codes[pre_offsets[i]:pre_offsets[i + 1]]:
+                other = node_of(prerequisite)
+                if other >= n_internal: # not a course of this program
+                    dangling.add((codes[node], prerequisite))
+                requires[node].append(other)
+            for corequisite in co_codes[co_offsets[i]:co_offsets[i + 1]]:
+                other = node_of(corequisite)
+                if other >= n_internal:
+                    dangling.add((codes[node], corequisite))
+                coreq_edges.append((node, other))
+
+        n = len(codes)
+        requires += [[] for _ in range(n - n_internal)]
+        required_by = [[] for _ in range(n)]
+        for node, prerequisites in enumerate(requires):
+            for prerequisite in prerequisites:
+                required_by[prerequisite].append(node)
+
+        component, components = strongly_connected(n, requires)
+        cycles = [sorted(codes[m] for m in members) for members in components
+                  if len(members) > 1 or members[0] in requires[members[0]]]
+        before = _closure(requires, component, components)
+        # The reversed graph has the same components; a reverse topological
+        # order for it is the forward order of the original.
+        reverse_component = [len(components) - 1 - c for c in component]
+        unlocks = _closure(required_by, reverse_component, components[::-1])
+
+        corequisites = [0] * n
+        for a, b in coreq_edges:
+            corequisites[a] |= 1 << b
+            corequisites[b] |= 1 << a
+
+        return cls(parsed["program"]["id"], codes, n_internal, before, unlocks,
+                   corequisites, cycles, sorted(dangling))
+
+    # ---------- lookups ----------
+    def _decode(self, bits):
+        return [self.codes[i] for i in iter_bits(bits)]
+
+    def prerequisites_of(self, code):
+        """Every course that must be taken before code (transitively)."""
+        node = self._nodes.get(code)
+        return [] if node is None else self._decode(self.before[node])
+
+    def unlocked_by(self, code):
+        """Every course that code is a (transitive) prerequisite of."""
+        node = self._nodes.get(code)
+        return [] if node is None else self._decode(self.unlocks[node])
+
+    def corequisites_of(self, code):
+        node = self._nodes.get(code)
+        return [] if node is None else self._decode(self.corequisites[node])
+
+    def requires(self, code, prerequisite):
+        """True if prerequisite must (transitively) be taken before code."""
+        node, other = self._nodes.get(code), self._nodes.get(prerequisite)
+        return node is not None and other is not None and bool(self.before[node] >> other & 1)
+
+    def missing(self, code, completed):
+        """Prerequisites of code not covered by the completed course codes."""
+        node = self._nodes.get(code)
+        if node is None:
+            return []
+        done = 0
+        for c in completed:
+            other = self._nodes.get(c)
+            if other is not None:
+                done |= 1 << other
+        return self._decode(self.before[node] & ~done)
+
+    # ---------- serialization ----------
+    def to_dict(self):
+        return {
+            "codes": self.codes,
+            "n_internal": self.n_internal,
+            "before": [format(b, "x") for b in self.before],
+            "unlocks": [format(b, "x") for b in self.unlocks],
+            "corequisites": [format(b, "x") for b in self.corequisites],
+            "cycles": self.cycles,
+            "dangling": self.dangling
+        }
+
+    @classmethod
+    def from_dict(cls, program_id, data):
+        return cls(program_id, data["codes"], data["n_internal"],
+                   [int(b, 16) for b in data["before"]],
+                   [int(b, 16) for b in data["unlocks"]],
+                   [int(b, 16) for b in data["corequisites"]],
+                   data["cycles"], data["dangling"])
+
+
+def _build_one(job):
+    graph = PrerequisiteGraph.from_program(load_program(*job))
+    return graph.program_id, graph.to_dict()
+
+
+def build_graphs(directories=DEFAULT_SOURCES, workers=None, parsed_dir=DEFAULT_PARSED):
+    """Build the graph of every program under the given roots in parallel.
+
+    Each worker reads a program's parsed artifact (re-parsing the CSV only
+    if it changed since). Returns {program_id: PrerequisiteGraph.to_dict()}.
+    """
+    jobs = [(path, root, parsed_dir) for path, root in iter_corpus(directories)]
+    return dict(sorted(process_map(_build_one, jobs, workers)))
+
+
+def save_graphs(graphs, out_path):
+    write_json(out_path, {"v": FORMAT_VERSION, "programs": graphs})
+
+
+def load_graphs(path=DEFAULT_OUT):
+    """Load the artifact as {program_id: PrerequisiteGraph}."""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get("v") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported graph format: {data.get('v')}")
+    return {pid: PrerequisiteGraph.from_dict(pid, g) for pid, g in data["programs"].items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build CTDT prerequisite graphs with closures")
+    parser.add_argument("directories", nargs="*", default=[str(d) for d in DEFAULT_SOURCES],
+                        help="Corpus roots to scan recursively (default: Organized_CTDT and Organized_KHGD)")
+    parser.add_argument("--out", "-o", default=str(DEFAULT_OUT), help="Graph artifact file")
+    parser.add_argument("--parsed", default=str(DEFAULT_PARSED), help="Parsed program artifacts (see ctdt_parser.py)")
+    parser.add_argument("--workers", "-j", type=int, default=None, help="Worker processes for re-parsing (default: all cores)")
+    parser.add_argument("--program", help="Query a program in an existing artifact instead of building")
+    parser.add_argument("--course", help="Course code to query (with --program)")
+    args = parser.parse_args()
+
+    if args.program:
+        graph = load_graphs(args.out).get(args.program)
+        if graph is None:
+            print(f"{args.program}: not in artifact")
+            return
+        if args.course:
+            print(f"Before {args.course}: {', '.join(graph.prerequisites_of(args.course)) or '-'}")
+            print(f"Unlocks: {', '.join(graph.unlocked_by(args.course)) or '-'}")
+            print(f"Co-requisites: {', '.join(graph.corequisites_of(args.course)) or '-'}")
+        for cycle in graph.cycles:
+            print(f"CYCLE: {', '.join(cycle)}")
+        for course, reference in graph.dangling:
+            print(f"DANGLING: {course} -> {reference}")
+        return
+
+    graphs = build_graphs(args.directories, args.workers, args.parsed)
+    save_graphs(graphs, args.out)
+    n_cycles = sum(len(g["cycles"]) for g in graphs.values())
+    n_dangling = sum(len(g["dangling"]) for g in graphs.values())
+    print(f"{len(graphs)} programs, {n_cycles} cycles, {n_dangling} dangling references -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Pack a curriculum (CTDT) CSV tree into one memory-mappable file.
+
+Layout:
+
+    header   magic, index offset, index length        (24 bytes)
+    data     every CSV's raw bytes, back to back
+    index    JSON {relative path: [offset, length, size, mtime_ns]}
+
+An update appends changed files and a new index; the header always points
+at the newest index.
+
+CorpusPack maps the pack once and hands out zero-copy memoryview slices, so
+scanning the corpus costs one open() instead of one per file.
+
+Packs default to .cache/ctdt/ at the repository root, outside public/
+(which Vite copies into the build).
+
+Usage:
+    python ctdt_pack.py [DIRECTORY] [--out FILE] [--force]
+
+Without --force an existing pack is updated in place (see update_pack).
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+from ctdt_common import DEFAULT_DIRECTORY, atomic_open, iter_csv_files
+
+PACK_DIR = Path(__file__).resolve().parents[2] / ".cache" / "ctdt"
+MAGIC = b"CTDTPAK1"
+_HEADER = struct.Struct("<8sQQ")
+
+
+def default_pack_path(directory):
+    """Pack location for a corpus root: PACK_DIR/<name>-<path hash>.pack"""
+    directory = Path(directory).resolve()
+    digest = hashlib.md5(str(directory).encode('utf-8')).hexdigest()[:8]
+    return PACK_DIR / f"{directory.name}-{digest}.pack"
+
+
+def _scan(directory):
+    """{relative path: (path, size, mtime_ns)} for every CSV under directory."""
+    directory = Path(directory)
+    files = {}
+    for path in iter_csv_files(directory):
+        stat = path.stat()
+        files[path.relative_to(directory).as_posix()] = (path, stat.st_size, stat.st_mtime_ns)
+    return files
+
+
+def build_pack(directory, out_path=None):
+    """Concatenate every CSV under directory into a pack file."""
+    directory = Path(directory)
+    out_path = Path(out_path) if out_path else default_pack_path(directory)
+    index = {}
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with atomic_open(out_path, 'wb') as out:
+        out.write(b"\x00" * _HEADER.size)
+        for rel_path, (path, size, mtime_ns) in _scan(directory).items():
+            with open(path, 'rb') as f:
+                data = f.read()
+            index[rel_path] = [out.tell(), len(data), size, mtime_ns]
+            out.write(data)
+        index_offset = out.tell()
+        blob = json.dumps(index, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        out.write(blob)
+        out.seek(0)
+        out.write(_HEADER.pack(MAGIC, index_offset, len(blob)))
+    return out_path
+
+
+def update_pack(directory, pack_path=None):
+    """Bring a pack in line with the CSVs under directory, reading only what changed.
+
+    New and changed files are appended after the pack's end with a new
+    index behind them, and the header is switched to that index last, so
+    a reader opening the pack meanwhile still sees the old, consistent
+    one. Replaced and removed files stay behind as dead bytes until they
+    outweigh the live data, when the pack is rebuilt from scratch.
+    Returns the number of files (re)packed.
+    """
+    directory = Path(directory)
+    pack_path = Path(pack_path) if pack_path else default_pack_path(directory)
+    current = _scan(directory)
+    try:
+        with CorpusPack(pack_path) as pack:
+            index = dict(pack.index)
+    except (OSError, ValueError):
+        build_pack(directory, pack_path)
+        return len(current)
+
+    changed = [rel for rel, (_, size, mtime_ns) in current.items()
+               if rel not in index or index[rel][2:] != [size, mtime_ns]]
+    if not changed and index.keys() == current.keys():
+        return 0
+    index = {rel: entry for rel, entry in index.items() if rel in current}
+    live = sum(entry[1] for entry in index.values()) + sum(current[rel][1] for rel in changed)
+    if pack_path.stat().st_size - _HEADER.size > 2 * live:
+        build_pack(directory, pack_path)
+        return len(current)
+
+    with open(pack_path, 'r+b') as out:
+        out.seek(0, os.SEEK_END)
+        for rel_path in changed:
+            path, size, mtime_ns = current[rel_path]
+            with open(path, 'rb') as f:
+                data = f.read()
+            index[rel_path] = [out.tell(), len(data), size, mtime_ns]
+            out.write(data)
+        index_offset = out.tell()
+        blob = json.dumps(index, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        out.write(blob)
+        out.flush()
+        out.seek(0)
+        out.write(_HEADER.pack(MAGIC, index_offset, len(blob)))
+    return len(changed)
+
+
+def is_fresh(directory, pack_path=None):
+    """True if the pack holds exactly the CSVs under directory, unchanged."""
+    pack_path = Path(pack_path) if pack_path else default_pack_path(directory)
+    try:
+        with CorpusPack(pack_path) as pack:
+            packed = {rel: (entry[2], entry[3]) for rel, entry in pack.index.items()}
+    except (OSError, ValueError):
+        return False
+    current = {rel: (size, mtime_ns) for rel, (_, size, mtime_ns) in _scan(directory).items()}
+    return packed == current
+
+
+class CorpusPack:
+    """Read-only, memory-mapped view of a pack file."""
+
+    def __init__(self, pack_path):
+        self.path = Path(pack_path)
+        with open(self.path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < _HEADER.size:
+            self.close()
+            raise ValueError(f"{self.path}: not a CTDT pack")
+        magic, index_offset, index_length = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path}: not a CTDT pack")
+        self._view = memoryview(self._mm)
+        self.index = json.loads(str(self._view[index_offset:index_offset + index_length], 'utf-8'))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if getattr(self, "_view", None) is not None:
+            self._view.release()
+            self._view = None
+        try:
+            self._mm.close()
+        except BufferError: # a caller still holds a view; unmapped once it is released
+            pass
+
+    def __contains__(self, rel_path):
+        return rel_path in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def paths(self):
+        """Relative paths in the pack, sorted."""
+        return sorted(self.index)
+
+    def stat(self, rel_path):
+        """(size, mtime_ns) of the file when it was packed."""
+        entry = self.index[rel_path]
+        return entry[2], entry[3]
+
+    def view(self, rel_path):
+        """Zero-copy memoryview of a file's raw bytes."""
+        offset, length = self.index[rel_path][:2]
+        return self._view[offset:offset + length]
+
+    def text(self, rel_path):
+        """A file's content decoded as UTF-8 (BOM stripped)."""
+        return str(self.view(rel_path), 'utf-8-sig')
+
+    def reader(self, rel_path):
+        """csv.reader over a packed file."""
+        return csv.reader(io.StringIO(self.text(rel_path), newline=None))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack CTDT CSVs into one memory-mappable file")
+    parser.add_argument("directory", nargs="?", default=str(DEFAULT_DIRECTORY), help="Corpus root to scan recursively")
+    parser.add_argument("--out", "-o", default=None, help=f"Pack file (default: under {PACK_DIR})")
+    parser.add_argument("--force", action="store_true", help="Rebuild from scratch instead of updating in place")
+    args = parser.parse_args()
+
+    out_path = Path(args.out) if args.out else default_pack_path(args.directory)
+    if args.force:
+        build_pack(args.directory, out_path)
+        packed = None
+    else:
+        packed = update_pack(args.directory, out_path)
+        if not packed:
+            print(f"{out_path} is up to date")
+            return
+    with CorpusPack(out_path) as pack:
+        updated = f" ({packed} updated)" if packed is not None else ""
+        print(f"Packed {len(pack)} files{updated} -> {out_path} ({out_path.stat().st_size / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
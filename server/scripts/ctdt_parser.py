@@ -0,0 +1,250 @@
+"""
+Parse curriculum (CTDT) CSVs into a normalized program -> sections -> courses
+structure and write one compact columnar JSON artifact per program.
+
+Each CSV is streamed once. Course rows take their English name from the
+subtitle row that follows them, and the "Học phần tiên quyết/song hành"
+column is split into prerequisite and co-requisite (SH/SHT) codes.
+
+Usage:
+    python ctdt_parser.py [DIRECTORY ...] [--out DIR] [--workers N]
+
+Writes DIR/<relative path>.json for every CSV under each DIRECTORY. Each
+artifact records its CSV's size and mtime, so load_programs() (used by the
+catalog and graph builders) reads fresh artifacts instead of re-parsing
+and only re-parses CSVs that changed since.
+"""
+
+import argparse
+import csv
+import json
+import re
+from pathlib import Path
+from ctdt_common import CTDT_ROOT, DEFAULT_SOURCES, iter_corpus, process_map, write_json
+from ctdt_rows import COURSE, ENGLISH, SECTION, classify_row, is_blank
+
+DEFAULT_OUT = CTDT_ROOT / "Parsed_CTDT"
+FORMAT_VERSION = 1
+COREQUISITE_TAGS = frozenset({"SH", "SHT"}) # song hành
+
+_FILENAME_PATTERN = re.compile(r'^(.*?)_(CTDT|KHGD)_(Từ_)?(\d{4})_(.+)$')
+_REQUIREMENT_PATTERN = re.compile(r'([A-Z]{2}\d{4,5})\s*(?:\(\s*(\w+)\s*\))?')
+_SECTION_NUMBER_PATTERN = re.compile(r'^(?:[IVXLC]+|[A-Z](\d+)?|\d+)((?:\.\d+)*)\.?\s')
+_SECTION_TAG_PATTERN = re.compile(r'\[(\w+)\]\s*$')
+
+
+def parse_credits(value):
+    """Credits as int (or float), None when blank or not a number."""
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        return None
+    return int(number) if number.is_integer() else number
+
+
+def parse_requirements(value):
+    """Split a requisite cell into ([(code, tag)] prerequisites, [(code, tag)] co-requisites)."""
+    prerequisites, corequisites = [], []
+    for code, tag in _REQUIREMENT_PATTERN.findall(value):
+        (corequisites if tag in COREQUISITE_TAGS else prerequisites).append((code, tag))
+    return prerequisites, corequisites
+
+
+def program_info(path, root=None):
+    """Program metadata from a CTDT path: faculty/major folders and file name."""
+    path = Path(path)
+    rel_path = path.relative_to(root) if root else Path(path.name)
+    match = _FILENAME_PATTERN.match(path.stem)
+    parents = rel_path.parent.parts
+    return {
+        "id": rel_path.with_suffix("").as_posix(),
+        "faculty": parents[0] if len(parents) > 1 else None,
+        "major": parents[-1] if parents else None,
+        "kind": match.group(2) if match else None,
+        "year": int(match.group(4)) if match else None,
+        "from_year": bool(match and match.group(3)), # "Từ 2024" = 2024 onwards
+        "source": rel_path.as_posix()
+    }
+
+
+def _section_level(name, previous_level):
+    match = _SECTION_NUMBER_PATTERN.match(name)
+    if match:
+        # "II." -> 1, "II.1." / "A1." -> 2, "D.2.2." -> 3
+        return 1 + bool(match.group(1)) + match.group(2).count(".")
+    # Unnumbered headings ("Các môn tự chọn nhóm A") sit under the last numbered one
+    return previous_level + 1 if previous_level else 1
+
+
+def parse_program(path, root=None):
+    """Parse one CTDT CSV into {"program", "sections", "courses"} (row-oriented)."""
+    sections, courses = [], []
+    last_kind = None
+    numbered_level = 0
+
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        next(reader, None) # Skip header
+
+        for row in reader:
+            if len(row) < 4:
+                row = row + [""] * (4 - len(row))
+            kind = classify_row(row)
+            name = row[2].strip()
+
+            if kind == COURSE:
+                prerequisites, corequisites = parse_requirements(row[4] if len(row) > 4 else "")
+                courses.append({
+                    "code": row[1].strip() or None,
+                    "name": name,
+                    "name_en": None,
+                    "credits": parse_credits(row[3]),
+                    "section": len(sections) - 1 if sections else None,
+                    "prerequisites": prerequisites,
+                    "corequisites": corequisites,
+                    "note": row[5].strip() if len(row) > 5 and not is_blank(row[5]) else None
+                })
+            elif kind == SECTION:
+                level = _section_level(name, numbered_level)
+                if _SECTION_NUMBER_PATTERN.match(name):
+                    numbered_level = level
+                parent = next((i for i in range(len(sections) - 1, -1, -1)
+                               if sections[i]["level"] < level), None)
+                tag = _SECTION_TAG_PATTERN.search(name)
+                sections.append({
+                    "name": name,
+                    "name_en": None,
+                    "level": level,
+                    "parent": parent,
+                    "tag": tag.group(1) if tag else None,
+                    "credits": parse_credits(row[3])
+                })
+            elif kind == ENGLISH:
+                # Subtitle of the course or section directly above
+                if last_kind == COURSE and courses[-1]["name_en"] is None:
+                    courses[-1]["name_en"] = name
+                elif last_kind == SECTION and sections[-1]["name_en"] is None:
+                    sections[-1]["name_en"] = name
+            last_kind = kind
+
+    return {"program": program_info(path, root), "sections": sections, "courses": courses}
+
+
+def to_columnar(program, stat=None):
+    """Column-per-field layout; requisite lists are CSR (offsets + flat values).
+
+    stat is the source CSV's [size, mtime_ns], recorded for freshness checks.
+    """
+    courses = program["courses"]
+    columns = {key: [c[key] for c in courses]
+               for key in ("code", "name", "name_en", "credits", "section", "note")}
+    for key, prefix in (("prerequisites", "pre"), ("corequisites", "co")):
+        offsets, codes, tags = [0], [], []
+        for c in courses:
+            for code, tag in c[key]:
+                codes.append(code)
+                tags.append(tag)
+            offsets.append(len(codes))
+        columns.update({f"{prefix}_offsets": offsets, f"{prefix}_codes": codes, f"{prefix}_tags": tags})
+
+    sections = program["sections"]
+    return {
+        "v": FORMAT_VERSION,
+        "stat": stat,
+        "program": program["program"],
+        "sections": {key: [s[key] for s in sections]
+                     for key in ("name", "name_en", "level", "parent", "tag", "credits")},
+        "courses": columns
+    }
+
+
+def write_program(program, out_path, stat=None):
+    """Write a parsed program as compact columnar JSON; returns the columnar dict."""
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    columnar = to_columnar(program, stat)
+    write_json(out_path, columnar)
+    return columnar
+
+
+def artifact_path(path, root, out_dir=DEFAULT_OUT):
+    """Where the columnar artifact of the CSV at path (under root) lives."""
+    return Path(out_dir) / Path(path).relative_to(root).with_suffix(".json")
+
+
+def _source_stat(path):
+    stat = Path(path).stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def read_artifact(path, root, out_dir=DEFAULT_OUT):
+    """The columnar program from a CSV's artifact, or None if missing or stale."""
+    try:
+        with open(artifact_path(path, root, out_dir), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("v") != FORMAT_VERSION or data.get("stat") != _source_stat(path):
+        return None
+    return data
+
+
+def _parse_one(job):
+    path, root, out_dir = job
+    stat = _source_stat(path) # taken first: a CSV edited while parsing stays stale
+    return write_program(parse_program(path, root), artifact_path(path, root, out_dir), stat)
+
+
+def load_program(path, root, out_dir=DEFAULT_OUT):
+    """Columnar program of one CSV: its artifact if fresh, else parsed and rewritten."""
+    program = read_artifact(path, root, out_dir)
+    return program if program is not None else _parse_one((path, root, out_dir))
+
+
+def load_programs(directories=DEFAULT_SOURCES, out_dir=DEFAULT_OUT, workers=None):
+    """Columnar programs of every CSV under the given roots, in corpus order.
+
+    Fresh artifacts are read directly; missing or stale ones are re-parsed
+    on a process pool and rewritten.
+    """
+    jobs = list(iter_corpus(directories))
+    programs = [read_artifact(path, root, out_dir) for path, root in jobs]
+    stale = [i for i, program in enumerate(programs) if program is None]
+    parsed = process_map(_parse_one, [(*jobs[i], out_dir) for i in stale], workers) if stale else ()
+    for i, program in zip(stale, parsed):
+        programs[i] = program
+    return programs
+
+
+def _parse_and_count(job):
+    program = _parse_one(job)
+    path, root, out_dir = job
+    return str(artifact_path(path, root, out_dir)), len(program["sections"]["name"]), len(program["courses"]["name"])
+
+
+def parse_tree(directories, out_dir, workers=None):
+    """Parse every CSV under the given roots in parallel; returns [(out_path, n_sections, n_courses)]."""
+    if isinstance(directories, (str, Path)):
+        directories = [directories]
+    jobs = [(path, root, out_dir) for path, root in iter_corpus(directories)]
+    return list(process_map(_parse_and_count, jobs, workers))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse CTDT CSVs into columnar JSON program artifacts")
+    parser.add_argument("directories", nargs="*", default=[str(d) for d in DEFAULT_SOURCES],
+                        help="Corpus roots to scan recursively (default: Organized_CTDT and Organized_KHGD)")
+    parser.add_argument("--out", "-o", default=str(DEFAULT_OUT), help="Output directory for program artifacts")
+    parser.add_argument("--workers", "-j", type=int, default=None, help="Worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    results = parse_tree(args.directories, args.out, args.workers)
+    print(f"{len(results)} programs, {sum(r[1] for r in results)} sections, "
+          f"{sum(r[2] for r in results)} courses -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Row classifier for curriculum (CTDT) CSV rows.
+
+A CTDT CSV mixes four kinds of rows under the header
+STT, Mã học phần, Tên học phần, Tín chỉ, Học phần tiên quyết/song hành, Ghi chú:
+
+    1,MT1003,Giải tích 1,4,,                        -> COURSE
+    ,,Calculus 1,,,                                 -> ENGLISH (subtitle of the course above)
+    ,,I. Toán & Khoa học Tự nhiên (...) [BB],,      -> SECTION
+    ,,,,,                                           -> UNKNOWN
+
+classify_row checks the cheap STT/code emptiness gates first and only looks
+at the name of rows that could be a section. Vietnamese text is detected by
+a set lookup over precomputed diacritic characters instead of a regex.
+"""
+
+COURSE, SECTION, ENGLISH, UNKNOWN = 0, 1, 2, 3
+KIND_NAMES = ("course", "section", "english", "unknown")
+
+_VIETNAMESE_LOWER = "àáạảãâầấậẩẫăằắặẳẵèéẹẻẽêềếệểễìíịỉĩòóọỏõôồốộổỗơờớợởỡùúụủũưừứựửữỳýỵỷỹđ"
+VIETNAMESE_CHARS = frozenset(_VIETNAMESE_LOWER + _VIETNAMESE_LOWER.upper())
+
+
+def is_blank(value):
+    """Same as `not value.strip()` without building a new string."""
+    return not value or value.isspace()
+
+
+def has_vietnamese(text):
+    """True if text contains a Vietnamese diacritic letter (either case)."""
+    return not VIETNAMESE_CHARS.isdisjoint(text)
+
+
+def starts_with_capital(text):
+    """True if text starts with an ASCII capital (the frontend's English-row test)."""
+    return "A" <= text[:1] <= "Z"
+
+
+def classify_row(row):
+    """Classify one CSV row as COURSE, SECTION, ENGLISH or UNKNOWN.
+
+    Rows with an STT or course code are courses. Otherwise the row is a
+    section when its name has Vietnamese text or it carries credits, an
+    English subtitle when its name starts with a capital, else unknown.
+    """
+    if len(row) < 4:
+        row = list(row) + [""] * (4 - len(row))
+    if not is_blank(row[0]) or not is_blank(row[1]):
+        return COURSE
+    name = row[2]
+    if has_vietnamese(name) or not is_blank(row[3]):
+        return SECTION
+    if starts_with_capital(name):
+        return ENGLISH
+    return UNKNOWN
+
+
+def iter_classified(reader, start=2):
+    """Yield (line_number, kind, row) for each row of a CSV reader."""
+    for i, row in enumerate(reader, start=start):
+        yield i, classify_row(row), row
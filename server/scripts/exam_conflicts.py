@@ -0,0 +1,289 @@
+"""
+Detect overlapping exams in exam-schedule (lichthi) payloads.
+
+Payloads look like htmlSpecs/lichthi.json:
+
+    {"code": ..., "data": {"headers": [...], "data": [
+        {"NHOMLOPMONHOCID": 454682, "MANHOMLOPMONHOC": "20251_CO2013_CC01_A_Thi",
+         "MANAMHOCHOCKY": "20251", "MAMONHOC": "CO2013", "NGAYTHI": "2025-12-30",
+         "GIOBD": "07g00", "GIO_SOPHUT": "90", "LOAITHI": "CK", "MSSV": ...}, ...]}}
+
+Records are decoded one at a time from the "data" array (or one per line
+for .jsonl files), so large dumps never sit in memory as one document.
+Exams are indexed per semester in a static interval tree; checking N class
+groups sorts their exams and sweeps once (O(N log N)).
+
+Usage:
+    python exam_conflicts.py PAYLOAD [PAYLOAD ...]                 # every student in the payloads
+    python exam_conflicts.py PAYLOAD --groups 454682 457676 ...    # one set of class groups
+    python exam_conflicts.py PAYLOAD --batch students.jsonl        # {"id": ..., "groups": [...]} per line
+"""
+
+import argparse
+import heapq
+import json
+import re
+from bisect import bisect_left
+from collections import defaultdict, namedtuple
+from datetime import date
+from pathlib import Path
+
+CHUNK_SIZE = 1 << 16
+_ARRAY_START = re.compile(r'"data"\s*:\s*\[')
+
+Exam = namedtuple("Exam", "group_id group_code semester course name kind start end room")
+
+
+# ============ LOADING ============
+def iter_records(path, chunk_size=CHUNK_SIZE):
+    """Yield raw exam records from a payload file without loading it whole."""
+    path = Path(path)
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        if path.suffix == ".jsonl":
+            for line in f:
+                if line.strip():
+                    yield from _records_of(json.loads(line))
+            return
+        yield from _iter_array(f, chunk_size)
+
+
+def _records_of(obj):
+    """Records of one decoded JSON value: a payload, a record list or a record."""
+    if isinstance(obj, list):
+        return obj
+    data = obj.get("data")
+    if isinstance(data, dict):
+        data = data.get("data")
+    if isinstance(data, list):
+        return data
+    return [obj]
+
+
+def _iter_array(f, chunk_size):
+    """Decode the items of the first "data": [...] array in f one by one."""
+    decoder = json.JSONDecoder()
+    buf = ""
+    while True:
+        match = _ARRAY_START.search(buf)
+        if match:
+            buf = buf[match.end():]
+            break
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+        buf = buf[-16:] + chunk # keep a tail in case the key straddles chunks
+
+    pos = 0
+    while True:
+        while pos < len(buf) and buf[pos] in " \t\r\n,":
+            pos += 1
+        if pos < len(buf) and buf[pos] == "]":
+            return
+        try:
+            if pos >= len(buf):
+                raise json.JSONDecodeError("need more data", buf, pos)
+            record, pos = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                raise ValueError(f"{f.name}: truncated exam payload")
+            buf, pos = buf[pos:] + chunk, 0
+            continue
+        yield record
+
+
+def parse_exam(record):
+    """Exam from one record; None when it has no usable date/time."""
+    try:
+        day = date.fromisoformat(record["NGAYTHI"][:10])
+        hours, _, minutes = record["GIOBD"].partition("g")
+        start = day.toordinal() * 1440 + int(hours) * 60 + int(minutes or 0)
+        end = start + int(record.get("GIO_SOPHUT") or 0)
+    except (KeyError, TypeError, ValueError):
+        return None
+    return Exam(record.get("NHOMLOPMONHOCID"), record.get("MANHOMLOPMONHOC"),
+                str(record.get("MANAMHOCHOCKY")), record.get("MAMONHOC"),
+                record.get("TENMONHOC"), record.get("LOAITHI"), start, end,
+                record.get("MAPHONG"))
+
+
+def format_time(minutes):
+    """Minute stamp back to 'YYYY-MM-DD HH:MM'."""
+    day, minute = divmod(minutes, 1440)
+    return f"{date.fromordinal(day).isoformat()} {minute // 60:02d}:{minute % 60:02d}"
+
+
+# ============ INTERVAL TREE ============
+class IntervalTree:
+    """Static interval tree: exams sorted by start, max end per subtree.
+
+    overlapping(start, end) returns every exam with exam.start < end and
+    exam.end > start in O(log n + k).
+    """
+
+    def __init__(self, exams):
+        self.exams = sorted(exams, key=lambda e: (e.start, e.end))
+        self.starts = [e.start for e in self.exams]
+        n = len(self.exams)
+        size = 1
+        while size < n:
+            size *= 2
+        self._size = size
+        self._max_end = [float("-inf")] * (2 * size)
+        for i, exam in enumerate(self.exams):
+            self._max_end[size + i] = exam.end
+        for node in range(size - 1, 0, -1):
+            self._max_end[node] = max(self._max_end[2 * node], self._max_end[2 * node + 1])
+
+    def __len__(self):
+        return len(self.exams)
+
+    def overlapping(self, start, end):
+        limit = bisect_left(self.starts, end) # only exams starting before end
+        found = []
+        stack = [(1, 0, self._size)]
+        while stack:
+            node, lo, hi = stack.pop()
+            if lo >= limit or self._max_end[node] <= start:
+                continue
+            if node >= self._size:
+                found.append(self.exams[lo])
+                continue
+            mid = (lo + hi) // 2
+            stack.append((2 * node + 1, mid, hi))
+            stack.append((2 * node, lo, mid))
+        return found
+
+
+# ============ INDEX ============
+class ExamIndex:
+    """Exams grouped by semester, with an interval tree per semester."""
+
+    def __init__(self):
+        self._by_group = defaultdict(dict) # semester -> group key -> [Exam]
+        self._trees = {}
+
+    @classmethod
+    def from_files(cls, paths):
+        index = cls()
+        for path in paths:
+            index.add_records(iter_records(path))
+        return index
+
+    def add_records(self, records):
+        """Index raw records; duplicates (one per enrolled student) collapse.
+
+        A group's exam is identified by its time slot alone: students of
+        one group sitting in different rooms share a single exam.
+        """
+        for record in records:
+            exam = parse_exam(record)
+            if exam is None:
+                continue
+            groups = self._by_group[exam.semester]
+            exams = groups.setdefault(exam.group_id, [])
+            if not any(e.start == exam.start and e.end == exam.end for e in exams):
+                exams.append(exam)
+                if exam.group_code is not None:
+                    groups[exam.group_code] = exams
+                self._trees.pop(exam.semester, None)
+
+    @property
+    def semesters(self):
+        return sorted(self._by_group)
+
+    def exams_for(self, semester, group):
+        """Exams of a class group, by NHOMLOPMONHOCID or MANHOMLOPMONHOC."""
+        return self._by_group.get(str(semester), {}).get(group, [])
+
+    def tree(self, semester):
+        semester = str(semester)
+        tree = self._trees.get(semester)
+        if tree is None:
+            groups = self._by_group.get(semester, {})
+            unique = {id(exams): exams for exams in groups.values()}.values()
+            tree = self._trees[semester] = IntervalTree(e for exams in unique for e in exams)
+        return tree
+
+    def overlapping(self, semester, start, end):
+        """All exams of a semester overlapping [start, end) in minutes."""
+        return self.tree(semester).overlapping(start, end)
+
+    def clashes_with(self, semester, group):
+        """Exams of other groups that overlap any exam of this group."""
+        own = self.exams_for(semester, group)
+        return [other for exam in own for other in self.overlapping(semester, exam.start, exam.end)
+                if other.group_id != exam.group_id]
+
+    def check(self, semester, groups):
+        """Overlapping exam pairs among a set of class groups.
+
+        Returns [(Exam, Exam)] ordered by start time. Groups may be given by
+        id or code (both name the same group once); unknown groups are
+        ignored, and a group never clashes with itself.
+        """
+        # id and code of one group map to the same list; keep each list once
+        selected = {id(exams): exams for exams in (self.exams_for(semester, g) for g in groups)}
+        exams = sorted(((e.start, e.end, i, e) for i, e in enumerate(
+            e for group_exams in selected.values() for e in group_exams)))
+        conflicts = []
+        active = [] # (end, i, exam) of exams still running
+        for start, end, i, exam in exams:
+            while active and active[0][0] <= start:
+                heapq.heappop(active)
+            conflicts.extend((other, exam) for _, _, other in active if other.group_id != exam.group_id)
+            heapq.heappush(active, (end, i, exam))
+        return conflicts
+
+    def check_batch(self, requests):
+        """Yield (id, conflicts) for each {"id", "semester", "groups"} request."""
+        default_semester = self.semesters[-1] if self._by_group else None
+        for request in requests:
+            semester = request.get("semester") or default_semester
+            yield request.get("id"), self.check(semester, request.get("groups", []))
+
+
+def students_in(paths):
+    """Batch requests for every (student, semester) found in the payloads."""
+    enrolled = defaultdict(list)
+    for path in paths:
+        for record in iter_records(path):
+            key = (record.get("MSSV"), str(record.get("MANAMHOCHOCKY")))
+            enrolled[key].append(record.get("NHOMLOPMONHOCID"))
+    return [{"id": mssv, "semester": semester, "groups": groups}
+            for (mssv, semester), groups in sorted(enrolled.items(), key=lambda kv: str(kv[0]))]
+
+
+def format_conflict(a, b):
+    return (f"{a.course} ({a.kind}, {format_time(a.start)}-{format_time(a.end)[-5:]}, {a.room}) "
+            f"overlaps {b.course} ({b.kind}, {format_time(b.start)}-{format_time(b.end)[-5:]}, {b.room})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find overlapping exams in lichthi payloads")
+    parser.add_argument("payloads", nargs="+", help="Payload files (.json, or .jsonl with one payload/record per line)")
+    parser.add_argument("--semester", "-s", default=None, help="MANAMHOCHOCKY, e.g. 20251 (default: latest)")
+    parser.add_argument("--groups", "-g", nargs="+", help="Class groups to check (NHOMLOPMONHOCID or MANHOMLOPMONHOC)")
+    parser.add_argument("--batch", "-b", help="JSONL of {\"id\", \"semester\", \"groups\"} requests")
+    args = parser.parse_args()
+
+    index = ExamIndex.from_files(args.payloads)
+    if args.groups:
+        groups = [int(g) if g.isdigit() else g for g in args.groups]
+        requests = [{"id": "groups", "semester": args.semester, "groups": groups}]
+    elif args.batch:
+        with open(args.batch, 'r', encoding='utf-8') as f:
+            requests = [json.loads(line) for line in f if line.strip()]
+    else:
+        requests = students_in(args.payloads)
+
+    total = 0
+    for request_id, conflicts in index.check_batch(requests):
+        total += len(conflicts)
+        for a, b in conflicts:
+            print(f"{request_id}: {format_conflict(a, b)}")
+    print(f"{len(requests)} checks, {total} overlapping exam pairs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+from ctdt_graph import PrerequisiteGraph, iter_bits, strongly_connected
+from ctdt_parser import to_columnar
+
+
+def program(*courses, program_id="P"):
+    """A columnar program from (code, prerequisites, corequisites) triples."""
+    return to_columnar({
+        "program": {"id": program_id},
+        "sections": [],
+        "courses": [{"code": code, "name": code, "name_en": None, "credits": 3, "section": None,
+                     "note": None, "prerequisites": [(p, "") for p in prerequisites],
+                     "corequisites": [(c, "SH") for c in corequisites]}
+                    for code, prerequisites, corequisites in courses]
+    })
+
+
+def test_dangling_reported_for_every_citer():
+    graph = PrerequisiteGraph.from_program(program(
+        ("A", ["X"], []),
+        ("B", ["X"], ["Y"]),
+        ("C", [], ["Y"]),
+        ("D", ["A"], [])))
+    assert graph.dangling == [("A", "X"), ("B", "X"), ("B", "Y"), ("C", "Y")]
+    assert graph.n_internal == 4
+
+
+def test_cycles():
+    graph = PrerequisiteGraph.from_program(program(
+        ("A", ["B"], []),
+        ("B", ["C"], []),
+        ("C", ["A"], []),
+        ("D", ["D"], []),
+        ("E", ["A"], [])))
+    assert sorted(graph.cycles) == [["A", "B", "C"], ["D"]]
+
+
+def test_strongly_connected_is_reverse_topological():
+    successors = [[1], [2], [0, 3], [], [3]]
+    component, components = strongly_connected(5, successors)
+    assert component[0] == component[1] == component[2]
+    assert len(components) == 3
+    for node, children in enumerate(successors):
+        for child in children:
+            assert component[child] <= component[node]
+
+
+def test_closure_bitsets():
+    graph = PrerequisiteGraph.from_program(program(
+        ("A", [], []),
+        ("B", ["A"], []),
+        ("C", ["B"], ["E"]),
+        ("D", ["C", "A"], []),
+        ("E", [], [])))
+    assert graph.prerequisites_of("D") == ["A", "B", "C"]
+    assert graph.prerequisites_of("A") == []
+    assert graph.unlocked_by("A") == ["B", "C", "D"]
+    assert graph.unlocked_by("D") == []
+    assert graph.corequisites_of("E") == ["C"]
+    assert graph.requires("D", "A") and not graph.requires("A", "D")
+    assert graph.missing("D", ["A", "C"]) == ["B"]
+    assert graph.before[graph._nodes["D"]] == 0b0111
+
+
+def test_closure_in_cycle_includes_itself():
+    graph = PrerequisiteGraph.from_program(program(("A", ["B"], []), ("B", ["A"], [])))
+    assert graph.prerequisites_of("A") == ["A", "B"]
+    assert graph.unlocked_by("B") == ["A", "B"]
+
+
+def test_round_trip():
+    graph = PrerequisiteGraph.from_program(program(("A", ["X"], []), ("B", ["A"], ["A"])))
+    loaded = PrerequisiteGraph.from_dict("P", graph.to_dict())
+    assert loaded.before == graph.before and loaded.unlocks == graph.unlocks
+    assert loaded.dangling == graph.dangling
+    assert list(iter_bits(0b10110)) == [1, 2, 4]
@@ -0,0 +1,82 @@
+import os
+
+from check_logic_conflict import validate_tree
+from ctdt_pack import CorpusPack, build_pack, is_fresh, update_pack
+
+HEADER = "STT,Mã học phần,Tên học phần,Tín chỉ,Học phần tiên quyết/song hành,Ghi chú\n"
+
+
+def write(path, body):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(HEADER + body, encoding="utf-8")
+
+
+def touch_later(path):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def corpus(tmp_path, n=6):
+    root = tmp_path / "corpus"
+    for i in range(n):
+        write(root / f"f{i % 2}" / f"p{i}.csv", f"{i},CO{1000 + i},Course {i},3,,\n")
+    return root
+
+
+def packed(pack_path):
+    with CorpusPack(pack_path) as pack:
+        return {rel: pack.text(rel) for rel in pack.paths()}
+
+
+def on_disk(root):
+    return {p.relative_to(root).as_posix(): p.read_text(encoding="utf-8-sig")
+            for p in sorted(root.rglob("*.csv"))}
+
+
+def test_update_repacks_only_changed_files(tmp_path):
+    root = corpus(tmp_path)
+    pack_path = build_pack(root, tmp_path / "c.pack")
+    assert update_pack(root, pack_path) == 0
+
+    write(root / "f0" / "p0.csv", ",,I. Giải tích [BB],,,\n")
+    touch_later(root / "f0" / "p0.csv")
+    write(root / "f1" / "new.csv", "1,CO9999,New,2,,\n")
+    (root / "f1" / "p1.csv").unlink()
+
+    assert update_pack(root, pack_path) == 2
+    assert is_fresh(root, pack_path)
+    assert packed(pack_path) == on_disk(root)
+
+
+def test_update_compacts_dead_bytes(tmp_path):
+    root = corpus(tmp_path, n=2)
+    pack_path = build_pack(root, tmp_path / "c.pack")
+    for _ in range(5):
+        for path in root.rglob("*.csv"):
+            touch_later(path)
+        update_pack(root, pack_path)
+    live = sum(len(p.read_bytes()) for p in root.rglob("*.csv"))
+    assert pack_path.stat().st_size < 3 * live + 1024
+    assert packed(pack_path) == on_disk(root)
+
+
+def test_update_builds_a_missing_or_corrupt_pack(tmp_path):
+    root = corpus(tmp_path)
+    pack_path = tmp_path / "c.pack"
+    assert update_pack(root, pack_path) == 6
+    pack_path.write_bytes(b"garbage")
+    assert update_pack(root, pack_path) == 6
+    assert packed(pack_path) == on_disk(root)
+
+
+def test_validate_with_pack_matches_tree(tmp_path):
+    root = corpus(tmp_path)
+    write(root / "f0" / "p0.csv", ",,I. Giải tích [BB],,,\n,,Calculus,,,\n")
+    pack_path = build_pack(root, tmp_path / "c.pack")
+    write(root / "f1" / "p1.csv", ",,II. Vật lý,3,,\n")
+    touch_later(root / "f1" / "p1.csv")
+    plain, _ = validate_tree(root, workers=1, full=True, manifest_path=tmp_path / "m1.json")
+    from_pack, _ = validate_tree(root, workers=1, full=True, manifest_path=tmp_path / "m2.json",
+                                 pack_path=pack_path)
+    assert from_pack == plain
+    assert any(conflicts for _, conflicts, _ in plain)
@@ -0,0 +1,48 @@
+import os
+
+from ctdt_catalog import CourseCatalog
+from ctdt_parser import load_programs, parse_program, read_artifact, to_columnar
+
+HEADER = "STT,Mã học phần,Tên học phần,Tín chỉ,Học phần tiên quyết/song hành,Ghi chú\n"
+PROGRAM = HEADER + (
+    ",,I. Toán & Khoa học Tự nhiên [BB],,,\n"
+    "1,MT1003,Giải tích 1,4,,\n"
+    ",,Calculus 1,,,\n"
+    "2,MT1005,Giải tích 2,4,MT1003 (TQ),\n"
+    "3,PH1003,Vật lý 1,4,MT1003 (SH),\n"
+)
+
+
+def corpus(tmp_path):
+    root = tmp_path / "corpus"
+    (root / "KHMT").mkdir(parents=True)
+    (root / "KHMT" / "KHMT_CTDT_2023_a.csv").write_text(PROGRAM, encoding="utf-8")
+    (root / "KHMT" / "KHMT_CTDT_2024_b.csv").write_text(PROGRAM.replace("PH1003", "PH1004"), encoding="utf-8")
+    return root
+
+
+def test_load_programs_reuses_fresh_artifacts(tmp_path):
+    root, out = corpus(tmp_path), tmp_path / "parsed"
+    paths = sorted(root.rglob("*.csv"))
+    assert all(read_artifact(path, root, out) is None for path in paths)
+
+    first = load_programs([root], out, workers=1)
+    assert first == [to_columnar(parse_program(path, root), first[i]["stat"]) for i, path in enumerate(paths)]
+    assert all(read_artifact(path, root, out) == program for path, program in zip(paths, first))
+
+    stat = paths[0].stat()
+    os.utime(paths[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert read_artifact(paths[0], root, out) is None
+    assert read_artifact(paths[1], root, out) is not None
+    second = load_programs([root], out, workers=1)
+    assert second[1] == first[1] and second[0]["stat"] != first[0]["stat"]
+    assert read_artifact(paths[0], root, out) == second[0]
+
+
+def test_catalog_from_artifacts(tmp_path):
+    root = corpus(tmp_path)
+    catalog = CourseCatalog.from_programs(load_programs([root], tmp_path / "parsed", workers=1))
+    assert catalog.course("MT1003")["name_en"] == "Calculus 1"
+    assert catalog.programs_for("MT1005") == ["KHMT/KHMT_CTDT_2023_a", "KHMT/KHMT_CTDT_2024_b"]
+    assert catalog.programs_for("PH1004") == ["KHMT/KHMT_CTDT_2024_b"]
+    assert catalog.years_for("MT1003") == [2023, 2024]
@@ -0,0 +1,55 @@
+from timetable_solver import (SharedSlotTables, TimetableSolver, parallel_count, parallel_solutions,
+                              random_semester, solve_batch)
+
+COURSES = random_semester(5, 5, seed=3)
+
+
+def names(schedule):
+    return tuple((g.course, g.group) for g in schedule)
+
+
+def test_shared_tables_round_trip():
+    solver = TimetableSolver(COURSES)
+    tables = SharedSlotTables.create(solver.masks, solver.weeklies, solver.weights)
+    try:
+        attached = SharedSlotTables.attach(tables.name)
+        for c in range(len(solver.masks)):
+            assert attached.course(c) == (solver.masks[c], solver.weeklies[c], solver.weights[c])
+        attached.close()
+    finally:
+        tables.unlink()
+
+
+def test_parallel_count_and_solutions_match_serial():
+    solver = TimetableSolver(COURSES)
+    assert parallel_count(COURSES, workers=2) == solver.count()
+    serial = sorted(map(names, solver.solutions()))
+    assert sorted(map(names, parallel_solutions(COURSES, workers=2))) == serial
+    limited = list(parallel_solutions(COURSES, workers=2, limit=7))
+    assert len(limited) == 7 and set(map(names, limited)) <= set(serial)
+
+
+def test_parallel_best_matches_serial():
+    serial = TimetableSolver(COURSES).best(10)
+    parallel = list(parallel_solutions(COURSES, workers=2, top_k=10))
+    assert [score for score, _ in parallel] == [score for score, _ in serial]
+
+
+def test_solve_batch_matches_serial():
+    by_code = dict(COURSES)
+    requests = [
+        {"id": "all", "courses": list(by_code)},
+        {"id": "pair", "courses": ["CO3003", "CO3001", "CO3003"]},
+        {"id": "none", "courses": []},
+        {"id": "unknown", "courses": ["CO3000", "XX0000"]},
+    ]
+    results = list(solve_batch(COURSES, requests, k=5, workers=2))
+    assert [request_id for request_id, _ in results] == ["all", "pair", "none", "unknown"]
+    for (request_id, best), request in zip(results, requests):
+        if request_id == "unknown":
+            assert best == []
+            continue
+        codes = list(dict.fromkeys(request["courses"]))
+        serial = TimetableSolver([(code, by_code[code]) for code in codes]).best(5)
+        assert [(score, names(s)) for score, s in best] == [(score, names(s)) for score, s in serial]
+    assert results[2][1] == [((0, 0), ())]
@@ -0,0 +1,83 @@
+import itertools
+
+import pytest
+
+from timetable_solver import TimetableSolver, build_courses, parse_weeks, random_semester, schedule_score
+
+
+def brute_force(courses):
+    """Every clash-free pick of one group per course, by trying them all."""
+    schedules = []
+    for schedule in itertools.product(*(groups for _, groups in courses)):
+        if all(not a.mask & b.mask for a, b in itertools.combinations(schedule, 2)):
+            schedules.append(schedule)
+    return schedules
+
+
+def score(schedule):
+    weekly = 0
+    for group in schedule:
+        weekly |= group.weekly
+    return schedule_score(weekly)
+
+
+def names(schedule):
+    return tuple((g.course, g.group) for g in schedule)
+
+
+def with_duplicates(courses):
+    """Copy the first group of every course under a new name (an identical mask)."""
+    return [(code, groups + [groups[0]._replace(group=groups[0].group + "b")]) for code, groups in courses]
+
+
+FIXTURES = [random_semester(5, 6, seed) for seed in range(4)] + [with_duplicates(random_semester(4, 5, 7))]
+
+
+@pytest.mark.parametrize("courses", FIXTURES)
+def test_count_and_solutions_match_brute_force(courses):
+    expected = brute_force(courses)
+    solver = TimetableSolver(courses)
+    assert solver.count() == len(expected)
+    assert sorted(map(names, solver.solutions())) == sorted(map(names, expected))
+
+
+@pytest.mark.parametrize("courses", FIXTURES)
+@pytest.mark.parametrize("k", [1, 3, 10, 50])
+def test_best_matches_brute_force(courses, k):
+    expected = sorted(score(s) for s in brute_force(courses))[:k]
+    best = TimetableSolver(courses).best(k)
+    assert [s for s, _ in best] == expected
+    valid = {names(s) for s in brute_force(courses)}
+    for s, schedule in best:
+        assert names(schedule) in valid and score(schedule) == s
+    assert len({names(schedule) for _, schedule in best}) == len(best)
+
+
+def test_no_courses_is_one_empty_schedule():
+    solver = TimetableSolver([])
+    assert solver.count() == 1
+    assert list(solver.solutions()) == [()]
+    assert solver.best(3) == [((0, 0), ())]
+
+
+def test_course_without_groups_has_no_schedule():
+    courses = build_courses([{"code": "A", "groups": [{"group": "1", "slots": []}]},
+                             {"code": "B", "groups": []}])
+    solver = TimetableSolver(courses)
+    assert solver.count() == 0 and list(solver.solutions()) == [] and solver.best(3) == []
+
+
+@pytest.mark.parametrize("text, weeks", [
+    ("123", [1, 2, 3]),
+    ("12", [1, 2]),
+    ("1-3", [1, 3]),
+    ("1234--789-12345678---", [1, 2, 3, 4, 7, 8, 9, 11, 12, 13, 14, 15, 16, 17, 18]),
+    ("3-5", [3, 4, 5]),
+    ("10-12", [10, 11, 12]),
+    ("5", [5]),
+    ("1-3|5", [1, 2, 3, 5]),
+    ("1, 3, 5-6", [1, 3, 5, 6]),
+    ("1-8|10-17", [*range(1, 9), *range(10, 18)]),
+])
+def test_parse_weeks(text, weeks):
+    assert parse_weeks(text) == weeks
@@ -0,0 +1,813 @@
+"""
+Bitmask timetable solver: pick one class group per course with no clashes.
+
+Every class group's weekly slots (day x period x week range) are encoded as
+one fixed-width int with a bit per (week, day, period), so two groups clash
+iff `a.mask & b.mask`. The search:
+
+  * merges groups of a course that have identical masks (expanded at the end),
+  * always branches on the course with the fewest compatible groups left,
+  * filters every remaining course's candidates after each pick and backtracks
+    as soon as one runs out (forward checking),
+  * for top-k, prunes partial schedules whose lower bound on (days, gaps) -
+    the days every remaining course must add, and the gaps none of them can
+    fill - is no better than the k-th best.
+
+Input JSON:
+
+    {"courses": [{"code": "CO3005", "groups": [
+        {"group": "A01", "slots": [{"day": "Thứ 2", "periods": "10 - 12",
+                                    "weeks": "1234--789-12345678------------"}]}]}]}
+
+day is 2..8 / "Thứ 2".."CN"; periods a list or "10 - 12"; weeks a list, a
+per-week position string as shown above or a "1-16|18" range string.
+
+With --workers the search is split across a process pool (see PARALLEL);
+--batch ranks schedules for many students against one semester file.
+
+Usage:
+    python timetable_solver.py COURSES.json [--top K] [--limit N] [--count] [--workers N]
+    python timetable_solver.py SEMESTER.json --batch students.jsonl [--top K] [--workers N]
+    python timetable_solver.py --benchmark [--courses 10] [--groups 10]
+"""
+
+import argparse
+import heapq
+import itertools
+import json
+import random
+import re
+import struct
+import sys
+import time
+from array import array
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from ctdt_common import chunk_size, default_workers, iter_bits
+
+PERIODS_PER_DAY = 17
+DAYS_PER_WEEK = 7
+SLOTS_PER_WEEK = PERIODS_PER_DAY * DAYS_PER_WEEK
+_DAY_BITS = (1 << PERIODS_PER_DAY) - 1
+_ALL_DAYS = (1 << DAYS_PER_WEEK) - 1
+_SUPERSETS = [sum(1 << m for m in range(_ALL_DAYS + 1) if m & d == d) for d in range(_ALL_DAYS + 1)]
+_WEEK_SEPARATORS = re.compile(r'[|,]')
+
+ClassGroup = namedtuple("ClassGroup", "course group mask weekly slots")
+
+
+# ============ ENCODING ============
+def parse_day(value):
+    """Day of week as 0 (Thứ 2 / Monday) .. 6 (Chủ nhật)."""
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if text in ("cn", "chủ nhật", "chu nhat"):
+            return 6
+        value = int(re.sub(r'\D', '', text))
+    if not 2 <= value <= 8:
+        raise ValueError(f"Invalid day: {value!r}")
+    return value - 2
+
+
+def parse_periods(value):
+    """Periods (tiết) as a list of ints from a list, "10 - 12" or "10,11,12"."""
+    if isinstance(value, str):
+        numbers = [int(n) for n in re.findall(r'\d+', value)]
+        if "-" in value and len(numbers) == 2:
+            numbers = list(range(numbers[0], numbers[1] + 1))
+        value = numbers
+    periods = [int(p) for p in value]
+    if any(not 1 <= p <= PERIODS_PER_DAY for p in periods):
+        raise ValueError(f"Invalid periods: {value!r}")
+    return periods
+
+
+def _is_position_weeks(text):
+    """True if text reads as a position string: character i is "-" or the last digit of week i + 1."""
+    return all(c in "- " or c == str((i + 1) % 10) for i, c in enumerate(text))
+
+
+def parse_weeks(value):
+    """Week numbers from a list, a position string or "1-16|18" ranges.
+
+    A string is read by position unless it has a "|" or "," separator or
+    cannot be a position string, so "1-3" is weeks 1 and 3 but "3-5",
+    "10-12" and "1-3|5" are ranges.
+    """
+    if not isinstance(value, str):
+        return sorted({int(w) for w in value})
+    text = value.strip()
+    if _WEEK_SEPARATORS.search(text) or not _is_position_weeks(text):
+        weeks = set()
+        for part in _WEEK_SEPARATORS.split(text):
+            part = part.strip()
+            if not part or part == "--":
+                continue
+            start, _, end = part.partition("-")
+            weeks.update(range(int(start), int(end or start) + 1))
+        return sorted(weeks)
+    # "1234--789-12345678---": character i stands for week i + 1
+    return [i + 1 for i, c in enumerate(text) if c not in "- "]
+
+
+def encode_slots(slots):
+    """(mask, weekly) for a group's slots.
+
+    mask has bit ((week - 1) * 7 + day) * 17 + period - 1 for every hour it
+    occupies; weekly folds the weeks away (bit day * 17 + period - 1).
+    """
+    mask = weekly = 0
+    for slot in slots:
+        day = parse_day(slot["day"])
+        pattern = 0
+        for period in parse_periods(slot["periods"]):
+            pattern |= 1 << (day * PERIODS_PER_DAY + period - 1)
+        weekly |= pattern
+        for week in parse_weeks(slot["weeks"]):
+            mask |= pattern << ((week - 1) * SLOTS_PER_WEEK)
+    return mask, weekly
+
+
+def load_courses(path):
+    """Courses from a solver JSON file as [(code, [ClassGroup])]."""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return build_courses(data["courses"])
+
+
+def build_courses(courses):
+    """Encode [{"code", "groups": [{"group", "slots"}]}] into [(code, [ClassGroup])]."""
+    encoded = []
+    for course in courses:
+        groups = []
+        for group in course["groups"]:
+            mask, weekly = encode_slots(group.get("slots", []))
+            groups.append(ClassGroup(course["code"], group["group"], mask, weekly, group.get("slots", [])))
+        encoded.append((course["code"], groups))
+    return encoded
+
+
+# ============ SCORING ============
+_popcount = int.bit_count if hasattr(int, "bit_count") else lambda x: bin(x).count("1")
+
+
+def schedule_score(weekly):
+    """(days on campus, idle periods between classes) of a weekly mask."""
+    days = gaps = 0
+    for day in range(DAYS_PER_WEEK):
+        bits = (weekly >> (day * PERIODS_PER_DAY)) & _DAY_BITS
+        if bits:
+            days += 1
+            span = bits.bit_length() - (bits & -bits).bit_length() + 1
+            gaps += span - bin(bits).count("1")
+    return days, gaps
+
+
+def days_on_campus(weekly):
+    return sum(1 for day in range(DAYS_PER_WEEK) if (weekly >> (day * PERIODS_PER_DAY)) & _DAY_BITS)
+
+
+def day_mask(weekly):
+    """Bit day set for every day a weekly mask has a class on."""
+    return sum(1 << day for day in range(DAYS_PER_WEEK) if (weekly >> (day * PERIODS_PER_DAY)) & _DAY_BITS)
+
+
+def unfillable_gaps(weekly, possible):
+    """Idle periods of weekly that no class in possible can fill.
+
+    Later classes only widen a day's span, so these gaps stay in any
+    schedule that extends weekly with classes from possible.
+    """
+    gaps = 0
+    for day in range(DAYS_PER_WEEK):
+        shift = day * PERIODS_PER_DAY
+        bits = (weekly >> shift) & _DAY_BITS
+        if bits:
+            low = bits & -bits
+            span = (1 << bits.bit_length()) - low
+            gaps += _popcount(span & ~bits & ~(possible >> shift))
+    return gaps
+
+
+# ============ SOLVER ============
+class TimetableSolver:
+    """Enumerate or rank clash-free picks of one group per course.
+
+    Groups of a course with identical masks are merged into one option.
+    A search domain is a bitset over a course's options, and
+    compatible[c][i][d] is the bitset of course d's options that do not
+    clash with option i of course c, so narrowing every remaining course
+    after a pick is one AND per course.
+    """
+
+    def __init__(self, courses):
+        self.courses = [(code, list(groups)) for code, groups in courses]
+        self.masks, self.weeklies, self.members = [], [], []
+        for _, groups in self.courses:
+            masks, weeklies, members = merge_groups(groups)
+            self.masks.append(masks)
+            self.weeklies.append(weeklies)
+            self.members.append(members)
+        self._init_tables([[len(m) for m in members] for members in self.members])
+
+    @classmethod
+    def from_tables(cls, masks, weeklies, weights):
+        """Solver over bare option tables (no ClassGroup members).
+
+        Used by worker processes: searches return option indexes, which the
+        owner of the ClassGroups expands.
+        """
+        solver = cls.__new__(cls)
+        solver.courses, solver.members = None, None
+        solver.masks, solver.weeklies = masks, weeklies
+        solver._init_tables(weights)
+        return solver
+
+    def _init_tables(self, weights):
+        self.weights = weights # groups merged into each option
+        self.compatible = compatibility(self.masks)
+        self._unit = [all(w == 1 for w in course) for course in weights]
+        self.days = [[day_mask(w) for w in course] for course in self.weeklies]
+
+    def _root(self):
+        if any(not masks for masks in self.masks):
+            return None # a course with no groups at all
+        return [(c, (1 << len(masks)) - 1) for c, masks in enumerate(self.masks)]
+
+    def _narrow(self, course, option, rest):
+        """Remaining domains after picking option of course; None on a wipe-out."""
+        row = self.compatible[course][option]
+        narrowed = []
+        for other, bits in rest:
+            bits &= row[other]
+            if not bits:
+                return None
+            narrowed.append((other, bits))
+        return narrowed
+
+    def _search(self, domains, weekly, chosen):
+        """Yield chosen option indexes (course order) for every consistent extension."""
+        if not domains:
+            yield list(chosen)
+            return
+        pick = min(range(len(domains)), key=lambda i: _popcount(domains[i][1]))
+        course, bits = domains[pick]
+        rest = domains[:pick] + domains[pick + 1:]
+        weeklies = self.weeklies[course]
+        for option in iter_bits(bits):
+            narrowed = self._narrow(course, option, rest)
+            if narrowed is None:
+                continue
+            chosen[course] = option
+            yield from self._search(narrowed, weekly | weeklies[option], chosen)
+        chosen[course] = None
+
+    def _weight(self, course, bits):
+        """Number of groups behind a set of options."""
+        if self._unit[course]:
+            return _popcount(bits)
+        weights = self.weights[course]
+        return sum(weights[option] for option in iter_bits(bits))
+
+    def _count(self, domains):
+        if not domains: # no courses: the empty schedule, as solutions() yields
+            return 1
+        if len(domains) == 1: # the last course: every compatible group completes a schedule
+            return self._weight(*domains[0])
+        if len(domains) == 2: # the last pair: no need to build narrowed domains
+            (a, a_bits), (b, b_bits) = domains
+            rows, weights = self.compatible[a], self.weights[a]
+            return sum(weights[option] * self._weight(b, b_bits & rows[option][b])
+                       for option in iter_bits(a_bits))
+        pick = min(range(len(domains)), key=lambda i: _popcount(domains[i][1]))
+        course, bits = domains[pick]
+        rest = domains[:pick] + domains[pick + 1:]
+        weights = self.weights[course]
+        total = 0
+        for option in iter_bits(bits):
+            narrowed = self._narrow(course, option, rest)
+            if narrowed is not None:
+                total += weights[option] * self._count(narrowed)
+        return total
+
+    def _best_chosen(self, k, domains, weekly=0, chosen=None):
+        """Top-k option picks as [((days, gaps), chosen)], best first.
+
+        Branch and bound: options that add the fewest days are tried first
+        so the heap fills with good schedules early, and a subtree is cut
+        once its lower bound on (days, gaps) cannot beat the k-th best
+        (ties never enter the heap, so the answer is unchanged).
+        """
+        heap = [] # (-days, -gaps, -seq, chosen): the worst kept pick on top
+        seq = itertools.count()
+        chosen = list(chosen) if chosen is not None else [None] * len(self.masks)
+
+        # course -> {domain bits: (days shared by all options, day sets some option fits in, weekly union)}
+        summaries = [{} for _ in self.masks]
+
+        def summary(course, bits):
+            cached = summaries[course].get(bits)
+            if cached is None:
+                shared, fits, union = _ALL_DAYS, 0, 0
+                course_days, weeklies = self.days[course], self.weeklies[course]
+                for option in iter_bits(bits):
+                    shared &= course_days[option]
+                    fits |= _SUPERSETS[course_days[option]]
+                    union |= weeklies[option]
+                cached = summaries[course][bits] = (shared, fits, union)
+            return cached
+
+        def bounded(weekly, days, domains):
+            # Every remaining course adds the days all its surviving options
+            # share, one more day if none of its options fits in the days
+            # so far, and gaps none of them can fill stay in the schedule.
+            worst_days, worst_gaps = -heap[0][0], -heap[0][1]
+            possible = 0
+            infos = [summary(course, bits) for course, bits in domains]
+            for shared, _, union in infos:
+                days |= shared
+                possible |= union
+            bound = _popcount(days)
+            if any(not fits >> days & 1 for _, fits, _ in infos):
+                bound += 1
+            if bound != worst_days:
+                return bound > worst_days
+            return worst_gaps == 0 or unfillable_gaps(weekly, possible) >= worst_gaps
+
+        def descend(domains, weekly, days):
+            if not domains:
+                score = schedule_score(weekly)
+                entry = (-score[0], -score[1], -next(seq), tuple(chosen))
+                if len(heap) < k:
+                    heapq.heappush(heap, entry)
+                elif entry > heap[0]:
+                    heapq.heapreplace(heap, entry)
+                return
+            pick = min(range(len(domains)), key=lambda i: _popcount(domains[i][1]))
+            course, bits = domains[pick]
+            rest = domains[:pick] + domains[pick + 1:]
+            weeklies, course_days = self.weeklies[course], self.days[course]
+            options = sorted(iter_bits(bits), key=lambda option: _popcount(days | course_days[option]))
+            for option in options:
+                added = days | course_days[option]
+                if len(heap) >= k and _popcount(added) > -heap[0][0]:
+                    break # options are sorted by days, so the rest are no better
+                narrowed = self._narrow(course, option, rest)
+                if narrowed is None:
+                    continue
+                combined = weekly | weeklies[option]
+                if len(heap) >= k and bounded(combined, added, narrowed):
+                    continue
+                chosen[course] = option
+                descend(narrowed, combined, added)
+            chosen[course] = None
+
+        descend(domains, weekly, day_mask(weekly))
+        return [((-d, -g), picked) for d, g, _, picked in sorted(heap, reverse=True)]
+
+    def expand(self, chosen):
+        """Every schedule (tuple of ClassGroup) behind one pick of options."""
+        return itertools.product(*(self.members[c][option] for c, option in enumerate(chosen)))
+
+    def take_best(self, k, ranked):
+        """Expand ranked [(score, chosen)] into the first k [(score, schedule)]."""
+        result = []
+        for score, chosen in ranked:
+            for schedule in itertools.islice(self.expand(chosen), k - len(result)):
+                result.append((score, schedule))
+            if len(result) >= k:
+                break
+        return result
+
+    def solutions(self, domains=None):
+        """Yield every clash-free schedule as a tuple of ClassGroup (course order)."""
+        domains = self._root() if domains is None else domains
+        if domains is None:
+            return
+        for chosen in self._search(domains, 0, [None] * len(self.masks)):
+            yield from self.expand(chosen)
+
+    def count(self, domains=None):
+        """Number of clash-free schedules, without enumerating them."""
+        domains = self._root() if domains is None else domains
+        return 0 if domains is None else self._count(domains)
+
+    def best(self, k=10, domains=None):
+        """Top-k schedules by (fewest days on campus, fewest gaps).
+
+        Returns [((days, gaps), schedule)] best first.
+        """
+        domains = self._root() if domains is None else domains
+        if domains is None or k <= 0:
+            return []
+        # each pick expands to >= 1 schedule, so the k best picks hold the k best schedules
+        return self.take_best(k, self._best_chosen(k, domains))
+
+
+def merge_groups(groups):
+    """(masks, weeklies, members) of a course, one entry per distinct mask."""
+    index = {}
+    masks, weeklies, members = [], [], []
+    for group in groups:
+        i = index.get(group.mask)
+        if i is None:
+            i = index[group.mask] = len(masks)
+            masks.append(group.mask)
+            weeklies.append(group.weekly)
+            members.append([])
+        members[i].append(group)
+    return masks, weeklies, members
+
+
+def compatibility(masks):
+    """compatible[c][i][d]: bitset of course d's options not clashing with option i of course c."""
+    table = []
+    for c, own in enumerate(masks):
+        rows = []
+        for mask in own:
+            row = []
+            for d, other in enumerate(masks):
+                bits = 0
+                if d != c:
+                    for j, other_mask in enumerate(other):
+                        if not mask & other_mask:
+                            bits |= 1 << j
+                row.append(bits)
+            rows.append(row)
+        table.append(rows)
+    return table
+
+
+# ============ PARALLEL ============
+_WEEKLY_BYTES = 16 # SLOTS_PER_WEEK bits, rounded up
+_TABLE_HEADER = struct.Struct("<QQ") # n_courses, mask bytes
+
+
+class SharedSlotTables:
+    """Option tables (mask, weekly, weight per option) in one shared memory block.
+
+    Layout: header, (n_courses + 1) uint64 record offsets, then one record
+    per option: mask bytes | weekly bytes | uint64 weight. Workers attach by
+    name and decode courses on demand, so the tables are never pickled.
+    """
+
+    def __init__(self, shm):
+        self.shm = shm
+        self.n_courses, self.mask_bytes = _TABLE_HEADER.unpack_from(shm.buf, 0)
+        self.record_bytes = self.mask_bytes + _WEEKLY_BYTES + 8
+        self._offsets = shm.buf[_TABLE_HEADER.size:_TABLE_HEADER.size + 8 * (self.n_courses + 1)].cast("Q")
+        self._records_start = _TABLE_HEADER.size + 8 * (self.n_courses + 1)
+
+    @classmethod
+    def create(cls, masks, weeklies, weights):
+        n_courses = len(masks)
+        widest = max((m.bit_length() for course in masks for m in course), default=0)
+        mask_bytes = max(8, -(-widest // 64) * 8)
+        record_bytes = mask_bytes + _WEEKLY_BYTES + 8
+        offsets = array("Q", [0])
+        for course in masks:
+            offsets.append(offsets[-1] + len(course))
+        records_start = _TABLE_HEADER.size + 8 * (n_courses + 1)
+        size = records_start + record_bytes * offsets[-1]
+
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        buf = shm.buf
+        _TABLE_HEADER.pack_into(buf, 0, n_courses, mask_bytes)
+        buf[_TABLE_HEADER.size:records_start] = offsets.tobytes() if sys.byteorder == "little" else _le(offsets)
+        pos = records_start
+        for course_masks, course_weeklies, course_weights in zip(masks, weeklies, weights):
+            for mask, weekly, weight in zip(course_masks, course_weeklies, course_weights):
+                buf[pos:pos + mask_bytes] = mask.to_bytes(mask_bytes, "little")
+                buf[pos + mask_bytes:pos + mask_bytes + _WEEKLY_BYTES] = weekly.to_bytes(_WEEKLY_BYTES, "little")
+                buf[pos + record_bytes - 8:pos + record_bytes] = weight.to_bytes(8, "little")
+                pos += record_bytes
+        return cls(shm)
+
+    @classmethod
+    def attach(cls, name):
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError: # Python < 3.13: no track flag
+            shm = shared_memory.SharedMemory(name=name)
+        return cls(shm)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def course(self, c):
+        """(masks, weeklies, weights) of course c."""
+        masks, weeklies, weights = [], [], []
+        mask_end = self.mask_bytes
+        weekly_end = mask_end + _WEEKLY_BYTES
+        pos = self._records_start + self.record_bytes * self._offsets[c]
+        for _ in range(self._offsets[c + 1] - self._offsets[c]):
+            record = self.shm.buf[pos:pos + self.record_bytes]
+            masks.append(int.from_bytes(record[:mask_end], "little"))
+            weeklies.append(int.from_bytes(record[mask_end:weekly_end], "little"))
+            weights.append(int.from_bytes(record[weekly_end:], "little"))
+            record.release()
+            pos += self.record_bytes
+        return masks, weeklies, weights
+
+    def close(self):
+        self._offsets.release()
+        self.shm.close()
+
+    def unlink(self):
+        self.close()
+        self.shm.unlink()
+
+
+def _le(values):
+    values = array(values.typecode, values)
+    values.byteswap()
+    return values.tobytes()
+
+
+_worker_tables = None
+_worker_solvers = {}
+
+
+def _attach_tables(name):
+    global _worker_tables
+    _worker_tables = SharedSlotTables.attach(name)
+    _worker_solvers.clear()
+
+
+def _worker_solver(course_ids):
+    solver = _worker_solvers.get(course_ids)
+    if solver is None:
+        if len(_worker_solvers) >= 64:
+            _worker_solvers.clear()
+        tables = [_worker_tables.course(c) for c in course_ids]
+        solver = _worker_solvers[course_ids] = TimetableSolver.from_tables(
+            [t[0] for t in tables], [t[1] for t in tables], [t[2] for t in tables])
+    return solver
+
+
+def _run_task(task):
+    """Worker: run one partition of a search over course_ids.
+
+    task = (mode, course_ids, prefix, domains, k); prefix holds the
+    (course, option) picks that define the partition and k is the top-k
+    size ("best") or the max number of picks to return ("solutions").
+    """
+    mode, course_ids, prefix, domains, k = task
+    solver = _worker_solver(course_ids)
+    if domains is None: # a whole request (batch mode)
+        domains = solver._root()
+        if domains is None:
+            return []
+    chosen, weekly, weight = [None] * len(course_ids), 0, 1
+    for course, option in prefix:
+        chosen[course] = option
+        weekly |= solver.weeklies[course][option]
+        weight *= solver.weights[course][option]
+    if mode == "count":
+        return weight * (solver._count(domains) if domains else 1)
+    if mode == "best":
+        return solver._best_chosen(k, domains, weekly, chosen)
+    return [tuple(picked) for picked in itertools.islice(solver._search(domains, weekly, chosen), k)]
+
+
+def _partition(solver, min_tasks):
+    """Split the search into >= min_tasks (prefix, domains) subtrees where possible."""
+    root = solver._root()
+    if root is None:
+        return []
+    tasks = [((), root)]
+    while len(tasks) < min_tasks:
+        split, progressed = [], False
+        for prefix, domains in tasks:
+            if not domains:
+                split.append((prefix, domains))
+                continue
+            progressed = True
+            pick = min(range(len(domains)), key=lambda i: _popcount(domains[i][1]))
+            course, bits = domains[pick]
+            rest = domains[:pick] + domains[pick + 1:]
+            for option in iter_bits(bits):
+                narrowed = solver._narrow(course, option, rest)
+                if narrowed is not None:
+                    split.append((prefix + ((course, option),), narrowed))
+        tasks = split
+        if not progressed:
+            break
+    return tasks
+
+
+def _pool(tables, workers):
+    return ProcessPoolExecutor(max_workers=workers, initializer=_attach_tables, initargs=(tables.name,))
+
+
+def _submit_ordered(pool, tasks, window):
+    """Like pool.map, but keeps at most window tasks in flight."""
+    pending = deque()
+    tasks = iter(tasks)
+    for task in itertools.islice(tasks, window):
+        pending.append(pool.submit(_run_task, task))
+    while pending:
+        result = pending.popleft().result()
+        for task in itertools.islice(tasks, 1):
+            pending.append(pool.submit(_run_task, task))
+        yield result
+
+
+def parallel_solutions(courses, workers=None, top_k=None, limit=None):
+    """Enumerate clash-free schedules on a process pool.
+
+    The search is split on the first branching course(s) and the option
+    tables live in shared memory. Yields schedules (tuples of ClassGroup)
+    partition by partition, at most limit in total; with top_k, yields the
+    top_k ((days, gaps), schedule) pairs best first once every partition
+    is done.
+    """
+    solver = TimetableSolver(courses)
+    workers = default_workers(workers)
+    course_ids = tuple(range(len(solver.masks)))
+    mode = "best" if top_k else "solutions"
+    tasks = [(mode, course_ids, prefix, domains, top_k or limit)
+             for prefix, domains in _partition(solver, workers * 16)]
+    if not tasks:
+        return
+
+    tables = SharedSlotTables.create(solver.masks, solver.weeklies, solver.weights)
+    pool = _pool(tables, workers)
+    try:
+        results = _submit_ordered(pool, tasks, workers * 2)
+        if top_k:
+            ranked = sorted((r for partition in results for r in partition), key=lambda r: r[0])
+            yield from solver.take_best(top_k, ranked)
+            return
+        schedules = (s for partition in results for chosen in partition for s in solver.expand(chosen))
+        yield from itertools.islice(schedules, limit)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        tables.unlink()
+
+
+def parallel_count(courses, workers=None):
+    """count() split across a process pool."""
+    solver = TimetableSolver(courses)
+    workers = default_workers(workers)
+    course_ids = tuple(range(len(solver.masks)))
+    tasks = [("count", course_ids, prefix, domains, None)
+             for prefix, domains in _partition(solver, workers * 4)]
+    if not tasks:
+        return 0
+    tables = SharedSlotTables.create(solver.masks, solver.weeklies, solver.weights)
+    try:
+        with _pool(tables, workers) as pool:
+            return sum(pool.map(_run_task, tasks))
+    finally:
+        tables.unlink()
+
+
+def solve_batch(courses, requests, k=10, workers=None):
+    """Top-k schedules for many students over one semester's class groups.
+
+    courses is the whole semester as [(code, [ClassGroup])]; each request is
+    {"id", "courses": [codes]}. The semester's option tables are placed in
+    shared memory once and each worker solves whole requests. Yields
+    (id, [((days, gaps), schedule)]) in request order; unknown codes yield
+    an empty list and no codes the one empty schedule, as best() does.
+    """
+    codes = {code: i for i, (code, _) in enumerate(courses)}
+    merged = [merge_groups(groups) for _, groups in courses]
+    requests = list(requests)
+    tasks, known = [], []
+    for request in requests:
+        ids = [codes.get(code) for code in dict.fromkeys(request.get("courses", []))]
+        known.append(None not in ids and k > 0)
+        tasks.append(("best", tuple(ids), (), None, k) if known[-1] else None)
+
+    workers = default_workers(workers)
+    tables = SharedSlotTables.create([m[0] for m in merged], [m[1] for m in merged],
+                                     [[len(g) for g in m[2]] for m in merged])
+    try:
+        with _pool(tables, workers) as pool:
+            live = [task for task in tasks if task is not None]
+            results = pool.map(_run_task, live, chunksize=chunk_size(len(live), workers))
+            for request, task in zip(requests, tasks):
+                if task is None:
+                    yield request.get("id"), []
+                    continue
+                ids = task[1]
+                ranked = next(results)
+                best = []
+                for score, chosen in ranked:
+                    members = [merged[c][2][option] for c, option in zip(ids, chosen)]
+                    for schedule in itertools.islice(itertools.product(*members), k - len(best)):
+                        best.append((score, schedule))
+                    if len(best) >= k:
+                        break
+                yield request.get("id"), best
+    finally:
+        tables.unlink()
+
+
+# ============ BENCHMARK ============
+_BLOCKS = ((1, 2, 3), (4, 5, 6), (7, 8, 9), (10, 11, 12), (2, 3), (5, 6), (8, 9), (11, 12))
+
+
+def random_semester(n_courses=10, n_groups=10, seed=0):
+    """A synthetic semester shaped like real registration data.
+
+    Each group has a weekly lecture in one of the usual period blocks
+    (sometimes two), and lab groups add a session on alternate weeks.
+    """
+    rng = random.Random(seed)
+    courses = []
+    for c in range(n_courses):
+        groups = []
+        for g in range(n_groups):
+            slots = []
+            for _ in range(rng.choice((1, 1, 2))):
+                slots.append({"day": rng.randint(2, 7), "periods": list(rng.choice(_BLOCKS)),
+                              "weeks": "1-8|10-17"})
+            if rng.random() < 0.3:
+                slots.append({"day": rng.randint(2, 7), "periods": list(rng.choice(_BLOCKS[4:])),
+                              "weeks": "|".join(str(w) for w in range(rng.choice((2, 3)), 17, 2))})
+            groups.append({"group": f"L{g + 1:02d}", "slots": slots})
+        courses.append({"code": f"CO{3000 + c}", "groups": groups})
+    return build_courses(courses)
+
+
+def benchmark(n_courses=10, n_groups=10, seed=0, repeat=3):
+    """Time count() / best() on a random semester; returns a result dict.
+
+    count() walks every solution, so it is timed once; best() is the
+    interactive path and takes the best of repeat runs.
+    """
+    solver = TimetableSolver(random_semester(n_courses, n_groups, seed))
+    timings = {}
+    for name, fn, runs in (("count", solver.count, 1), ("best10", lambda: solver.best(10), repeat)):
+        elapsed = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            result = fn()
+            elapsed.append(time.perf_counter() - started)
+        timings[name] = (min(elapsed) * 1000, result)
+    return {
+        "courses": n_courses, "groups": n_groups,
+        "solutions": timings["count"][1],
+        "count_ms": round(timings["count"][0], 2),
+        "best10_ms": round(timings["best10"][0], 2),
+        "best_score": timings["best10"][1][0][0] if timings["best10"][1] else None
+    }
+
+
+def _format_schedule(schedule):
+    return ", ".join(f"{g.course}/{g.group}" for g in schedule)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find clash-free timetables with bitmask search")
+    parser.add_argument("input", nargs="?", help="Courses JSON (see module docstring)")
+    parser.add_argument("--top", "-k", type=int, default=None, help="Show the K best schedules (fewest days, then gaps)")
+    parser.add_argument("--limit", "-n", type=int, default=20, help="Max schedules to print when enumerating")
+    parser.add_argument("--count", action="store_true", help="Only count clash-free schedules")
+    parser.add_argument("--workers", "-j", type=int, default=None, help="Search on N worker processes")
+    parser.add_argument("--batch", "-b", help="JSONL of {\"id\", \"courses\": [codes]} requests against the input semester")
+    parser.add_argument("--benchmark", action="store_true", help="Time the solver on a synthetic semester")
+    parser.add_argument("--courses", type=int, default=10, help="Benchmark: number of courses")
+    parser.add_argument("--groups", type=int, default=10, help="Benchmark: groups per course")
+    parser.add_argument("--seed", type=int, default=0, help="Benchmark: random seed")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        print(json.dumps(benchmark(args.courses, args.groups, args.seed)))
+        return
+    if not args.input:
+        parser.error("input is required unless --benchmark is given")
+
+    courses = load_courses(args.input)
+    if args.batch:
+        with open(args.batch, 'r', encoding='utf-8') as f:
+            requests = [json.loads(line) for line in f if line.strip()]
+        for request_id, best in solve_batch(courses, requests, args.top or 10, args.workers):
+            print(json.dumps({"id": request_id, "schedules": [
+                {"days": days, "gaps": gaps, "groups": {g.course: g.group for g in schedule}}
+                for (days, gaps), schedule in best]}, ensure_ascii=False))
+        return
+
+    parallel = args.workers is not None
+    if args.count:
+        print(parallel_count(courses, args.workers) if parallel else TimetableSolver(courses).count())
+        return
+    if args.top:
+        ranked = (parallel_solutions(courses, args.workers, top_k=args.top) if parallel
+                  else TimetableSolver(courses).best(args.top))
+        for (days, gaps), schedule in ranked:
+            print(f"{days} days, {gaps} gaps: {_format_schedule(schedule)}")
+        return
+    schedules = (parallel_solutions(courses, args.workers, limit=args.limit) if parallel
+                 else TimetableSolver(courses).solutions())
+    for schedule in itertools.islice(schedules, args.limit):
+        print(_format_schedule(schedule))
+
+
+if __name__ == "__main__":
+    main()